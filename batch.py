@@ -0,0 +1,125 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from expression_compiler import (CachedFunction, compile_expression, compile_vectorized, convert_power_notation,
+                                 ignore_error)
+from deepseek_conjunto import find_root_set
+from result_cache import ResultCache, cache_key, open_cache
+from tracing import SILENT, Tracer
+
+# Outcome of one expression; error is None on success and roots are then ascending.
+# cached is True when the roots came from the persistent result cache.
+SolveResult = namedtuple('SolveResult', ['expression', 'converted', 'roots', 'iterations', 'methods',
+                                         'evaluations', 'error', 'cached'], defaults=(False,))
+
+
+def solve_one(expression, search_range=(-100, 100), vectorized=False, cache=None, metrics=None, **options):
+    """
+    Solves a single expression and returns a SolveResult.
+    Any exception (invalid syntax, unknown names, solver failures) is caught
+    and stored in the error field, so a bad expression never aborts a batch.
+    evaluations counts the distinct scalar evaluations of f.
+    cache is a ResultCache or the path of one; on a hit the stored roots are
+    returned without compiling or evaluating the expression. Options without
+    a JSON form (such as an fdf callable) bypass it.
+    metrics (a metrics.Metrics) accumulates the counters of the solve.
+    """
+    converted = key = None
+    try:
+        converted = convert_power_notation(expression)
+        if cache is not None:
+            if not isinstance(cache, ResultCache):
+                cache = open_cache(cache)
+            key = cache_key(converted, search_range=list(search_range) if search_range else None,
+                            vectorized=vectorized, **options)
+        if key is not None:
+            hit = cache.get(key)
+            if hit is not None:
+                records, evaluations = hit
+                return _result(expression, converted, records, evaluations, cached=True)
+
+        f = CachedFunction(compile_expression(converted, on_error=ignore_error), maxsize=4096)
+        f_vec = compile_vectorized(converted) if vectorized else None
+        records = list(find_root_set(f, search_range, f_vec=f_vec, tracer=Tracer(SILENT), metrics=metrics,
+                                     **options))
+        evaluations = f.cache_info().misses
+        if key is not None:
+            cache.put(key, records, evaluations)
+    except Exception as e:
+        return SolveResult(expression, converted, [], [], [], 0, f"{type(e).__name__}: {e}")
+
+    return _result(expression, converted, records, evaluations)
+
+
+def _result(expression, converted, records, evaluations, cached=False):
+    return SolveResult(expression, converted, [r.x for r in records], [r.iterations for r in records],
+                       [r.method for r in records], evaluations, None, cached)
+
+
+def solve_many(expressions, search_range=(-100, 100), workers=None, chunksize=16, **options):
+    """
+    Solves many expressions and returns their SolveResults in input order.
+    Expressions are spread over a process pool of `workers` processes
+    (all cores when None); workers=1 solves them in this process. Extra
+    keyword arguments are passed on to find_all_roots (bracket_method,
+    step, scan, ...), plus vectorized=True for the array grid scan.
+    Errors are isolated per expression: a failing task only marks its own
+    results with an error message. A worker that dies breaks the whole
+    pool, so the tasks it took down are resubmitted to a new one; when a
+    round finishes nothing, tasks run alone (split down to single
+    expressions) until the expression that kills the worker is found, and
+    only that one keeps the error.
+    """
+    expressions = list(expressions)
+    if workers == 1:
+        return [solve_one(expr, search_range, **options) for expr in expressions]
+
+    results = [None] * len(expressions)
+    # Each task is a chunk of expression indices, so it carries several expressions
+    tasks = [list(range(i, min(i + chunksize, len(expressions)))) for i in range(0, len(expressions), chunksize)]
+    alone = False
+    while tasks:
+        batch = tasks[:1] if alone else tasks
+        broken = _run_tasks(batch, expressions, results, workers, search_range, options)
+        if not alone:
+            # Without progress the crash cannot be pinned on a task: run them one at a time
+            alone = len(broken) == len(batch)
+            tasks = broken
+        elif not broken:
+            alone = False
+            tasks = tasks[1:]
+        elif len(broken[0]) > 1:
+            tasks = [[i] for i in broken[0]] + tasks[1:]
+        else:
+            # Killed the worker on its own: keep the error result and carry on in parallel
+            alone = False
+            tasks = tasks[1:]
+    return results
+
+
+def _run_tasks(tasks, expressions, results, workers, search_range, options):
+    """
+    Solves the tasks on a new process pool, writing into results by index.
+    Tasks lost to a dead worker get an error result too, and are returned
+    so they can be run again.
+    """
+    broken = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_solve_chunk, [expressions[i] for i in task], search_range, options)
+                   for task in tasks]
+        for task, future in zip(tasks, futures):
+            try:
+                for i, result in zip(task, future.result()):
+                    results[i] = result
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                for i in task:
+                    results[i] = SolveResult(expressions[i], None, [], [], [], 0, error)
+                if isinstance(e, BrokenProcessPool):
+                    broken.append(task)
+    return broken
+
+
+def _solve_chunk(expressions, search_range, options):
+    return [solve_one(expr, search_range, **options) for expr in expressions]
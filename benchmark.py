@@ -0,0 +1,226 @@
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+import timeit
+
+from autodiff import compile_with_derivative
+from expression_compiler import compile_expression, ignore_error
+from bracketed_solvers import BRACKETED_SOLVERS, solve_bracket
+from deepseek_conjunto import find_root_set, string_to_function
+from tracing import SILENT, Tracer
+
+# Expressions used to measure the per-call cost of f(x)
+MICRO_EXPRESSIONS = [
+    "x**2 - 2",
+    "x**3 - 2*x + 1",
+    "sin(x) + cos(x)*exp(-x**2)",
+    "log(1 + x**2)*sqrt(abs(x)) - tan(x/3)",
+]
+
+def micro_benchmark(number=100000):
+    """Measures the per-call cost of the eval-based and compiled functions"""
+    print(f"{'expression':<42}{'eval (ns)':>12}{'compiled (ns)':>16}{'speedup':>10}")
+    for expr in MICRO_EXPRESSIONS:
+        f_eval = string_to_function(expr, compiled=False)
+        f_compiled = string_to_function(expr)
+
+        # Both modes must agree before timing them
+        for x in (-3.5, -1.0, 0.25, 2.0, 7.75):
+            assert f_eval(x) == f_compiled(x), f"Mismatch for {expr} at x={x}"
+
+        t_eval = min(timeit.repeat(lambda: f_eval(1.2345), number=number, repeat=3)) / number
+        t_compiled = min(timeit.repeat(lambda: f_compiled(1.2345), number=number, repeat=3)) / number
+        print(f"{expr:<42}{t_eval*1e9:>12.0f}{t_compiled*1e9:>16.0f}{t_eval/t_compiled:>9.1f}x")
+
+# Expressions and brackets used to compare the bracketed solvers
+BRACKET_PROBLEMS = [
+    ("x**2 - 2", 1, 2),
+    ("cos(x) - x", 0, 1),
+    ("x**3 - 2*x - 5", 2, 3),
+    ("exp(x) - 1", -0.5, 1.5),
+    ("atan(1000*(x - 0.3))", -1, 2),
+    ("(x - 1)**5", 0, 2.5),
+]
+
+def bracket_benchmark():
+    """Compares evaluation counts of the bracketed solvers on the same brackets"""
+    print(f"{'expression':<26}" + ''.join(f"{name:>12}" for name in BRACKETED_SOLVERS))
+    for expr, a, b in BRACKET_PROBLEMS:
+        f = string_to_function(expr)
+        counts = [solve_bracket(f, a, b, method)[2] for method in BRACKETED_SOLVERS]
+        print(f"{expr:<26}" + ''.join(f"{count:>12}" for count in counts))
+
+def _nested_roots():
+    """Roots of sin(cos(exp(x/10))) - 0.5 on [-30, 30]: cos(exp(x/10)) = pi/6"""
+    u = math.acos(math.pi / 6)
+    values = [u]
+    for k in (1, 2, 3):
+        values += [2 * math.pi * k - u, 2 * math.pi * k + u]
+    return [10 * math.log(v) for v in values if v < math.exp(3)]
+
+# Corpus for the pipeline benchmark: (name, expression, search range, known roots)
+SUITE = [
+    ("quadratic", "x**2 - 2", (-100, 100), [-math.sqrt(2), math.sqrt(2)]),
+    ("cubic", "x**3 - 2*x + 1", (-100, 100), [1.0, (-1 - math.sqrt(5)) / 2, (-1 + math.sqrt(5)) / 2]),
+    ("quartic", "(x - 1)*(x - 2)*(x - 3)*(x + 4)", (-100, 100), [1.0, 2.0, 3.0, -4.0]),
+    ("double_root", "x**2", (-100, 100), [0.0]),
+    ("double_and_simple", "(x - 3)**2*(x + 1)", (-100, 100), [3.0, -1.0]),
+    ("no_roots", "x**2 + 1", (-100, 100), []),
+    ("oscillatory", "sin(50*x)", (-1, 1), [k * math.pi / 50 for k in range(-15, 16)]),
+    ("poles", "tan(x)", (-10, 10), [k * math.pi for k in range(-3, 4)]),
+    ("domain_edge", "log(x) - 1", (-10, 10), [math.e]),
+    ("sqrt", "sqrt(x) - 2", (-10, 10), [4.0]),
+    ("nested", "sin(cos(exp(x/10))) - 0.5", (-30, 30), _nested_roots()),
+]
+
+# Pipeline configurations compared by the suite
+CONFIGS = {
+    "hybrid": dict(bracket_method='hybrid', polynomial=False),
+    "brent": dict(bracket_method='brent', polynomial=False),
+    "brent_vectorized": dict(bracket_method='brent', vectorized=True, polynomial=False),
+    "brent_adaptive": dict(bracket_method='brent', scan='adaptive', polynomial=False),
+    "brent_interval": dict(bracket_method='brent', scan='interval', polynomial=False),
+    "chebyshev": dict(scan='chebyshev', vectorized=True, polynomial=False),
+    "open_newton": dict(bracket_method='brent', open_method='newton', polynomial=False),
+    "open_secant": dict(bracket_method='brent', open_method='secant', polynomial=False),
+    "open_steffensen": dict(bracket_method='brent', open_method='steffensen', polynomial=False),
+    "open_halley": dict(bracket_method='brent', open_method='halley', polynomial=False),
+    "polynomial_fast_path": dict(bracket_method='brent', polynomial=True),
+}
+
+def _counted(func, counter, key):
+    """Wraps func so every call (or every array element) is added to counter[key]"""
+    def wrapper(x):
+        counter[key] += getattr(x, 'size', 1)
+        return func(x)
+    for name in ('expr', 'on_error'):
+        if hasattr(func, name):
+            setattr(wrapper, name, getattr(func, name))
+    return wrapper
+
+def run_case(expr, search_range, known_roots, config, match_tol=1e-6):
+    """Runs find_root_set once for a case and returns its measurements"""
+    options = dict(config)
+    vectorized = options.pop('vectorized', False)
+    counter = {'f': 0, 'fdf': 0, 'f_vec': 0}
+
+    # Domain errors are expected for some cases; keep them out of the output
+    f = _counted(compile_expression(expr, on_error=ignore_error), counter, 'f')
+    fdf = _counted(compile_with_derivative(expr), counter, 'fdf')
+    f_vec = _counted(string_to_function(expr, vectorized=True), counter, 'f_vec') if vectorized else None
+
+    start = time.perf_counter()
+    roots, iterations, methods = find_root_set(f, search_range, f_vec=f_vec, fdf=fdf,
+                                               tracer=Tracer(SILENT), **options).as_lists()
+    elapsed = time.perf_counter() - start
+
+    # Match found roots against the known ones
+    errors = []
+    for known in known_roots:
+        distance = min((abs(r - known) for r in roots), default=math.inf)
+        if distance < match_tol:
+            errors.append(distance)
+    spurious = sum(1 for r in roots if all(abs(r - k) >= match_tol for k in known_roots))
+
+    return {
+        'wall_time': elapsed,
+        'f_evals': counter['f'],
+        'fdf_evals': counter['fdf'],
+        'vector_evals': counter['f_vec'],
+        'roots_found': len(roots),
+        'roots_known': len(known_roots),
+        'roots_matched': len(errors),
+        'spurious': spurious,
+        'max_error': max(errors) if errors else None,
+        'iterations_per_root': iterations,
+        'mean_iterations': sum(iterations) / len(iterations) if iterations else 0,
+        'methods': sorted(set(methods)),
+    }
+
+def suite_benchmark(output=None, configs=None, repeat=3):
+    """Runs every corpus case under every configuration; best wall time of `repeat` runs"""
+    results = []
+    configs = configs or list(CONFIGS)
+    print(f"{'case':<20}{'config':<22}{'time (ms)':>10}{'f evals':>9}{'fdf':>6}{'vec':>7}"
+          f"{'found':>7}{'matched':>9}{'spurious':>9}{'iters':>7}")
+    for name, expr, search_range, known_roots in SUITE:
+        for config_name in configs:
+            runs = [run_case(expr, search_range, known_roots, CONFIGS[config_name]) for _ in range(repeat)]
+            best = min(runs, key=lambda r: r['wall_time'])
+            best.update({'case': name, 'expression': expr, 'config': config_name,
+                         'search_range': list(search_range)})
+            results.append(best)
+            print(f"{name:<20}{config_name:<22}{best['wall_time']*1e3:>10.2f}{best['f_evals']:>9}"
+                  f"{best['fdf_evals']:>6}{best['vector_evals']:>7}{best['roots_found']:>7}"
+                  f"{best['roots_matched']:>5}/{best['roots_known']:<3}{best['spurious']:>9}"
+                  f"{best['mean_iterations']:>7.1f}")
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'results': results,
+    }
+    if output:
+        with open(output, 'w') as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\nResults written to {output}")
+    return report
+
+def compare_reports(baseline, current, time_tolerance=1.25, eval_tolerance=1.10, min_time_delta=1e-3):
+    """
+    Lists speed and accuracy regressions of current against baseline.
+    Wall time only counts as a regression when it grows by more than
+    time_tolerance and by more than min_time_delta seconds (timer noise).
+    """
+    previous = {(r['case'], r['config']): r for r in baseline['results']}
+    regressions = []
+    for r in current['results']:
+        old = previous.get((r['case'], r['config']))
+        if old is None:
+            continue
+        label = f"{r['case']} [{r['config']}]"
+        if r['roots_matched'] < old['roots_matched']:
+            regressions.append(f"{label}: matched roots {old['roots_matched']} -> {r['roots_matched']}")
+        if r['spurious'] > old['spurious']:
+            regressions.append(f"{label}: spurious roots {old['spurious']} -> {r['spurious']}")
+        old_evals = old['f_evals'] + old['fdf_evals'] + old['vector_evals']
+        new_evals = r['f_evals'] + r['fdf_evals'] + r['vector_evals']
+        if new_evals > eval_tolerance * old_evals:
+            regressions.append(f"{label}: evaluations {old_evals} -> {new_evals}")
+        if r['wall_time'] > time_tolerance * old['wall_time'] \
+                and r['wall_time'] - old['wall_time'] > min_time_delta:
+            regressions.append(f"{label}: wall time {old['wall_time']*1e3:.2f} ms -> {r['wall_time']*1e3:.2f} ms")
+    return regressions
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmarks for the root-finding pipeline")
+    parser.add_argument('section', nargs='?', default='suite', choices=['micro', 'brackets', 'suite'])
+    parser.add_argument('--number', type=int, default=100000, help="calls per timing in the micro benchmark")
+    parser.add_argument('--output', help="write suite results to this JSON file")
+    parser.add_argument('--compare', help="JSON file of a previous suite run to check for regressions")
+    parser.add_argument('--config', action='append', choices=list(CONFIGS), help="run only these configurations")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per case; the fastest is kept")
+    args = parser.parse_args()
+
+    if args.section == 'micro':
+        micro_benchmark(args.number)
+    elif args.section == 'brackets':
+        bracket_benchmark()
+    else:
+        report = suite_benchmark(args.output, args.config, args.repeat)
+        if args.compare:
+            with open(args.compare) as fh:
+                regressions = compare_reports(json.load(fh), report)
+            if regressions:
+                print("\nRegressions against " + args.compare + ":")
+                for line in regressions:
+                    print("  " + line)
+                sys.exit(1)
+            print("\nNo regressions against " + args.compare)
+
+if __name__ == "__main__":
+    main()
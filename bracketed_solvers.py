@@ -0,0 +1,212 @@
+import math
+
+EPS = 2.220446049250313e-16
+
+
+def _check_bracket(f, a, b, fa, fb):
+    """Evaluates missing endpoint values and verifies the sign change"""
+    evaluations = 0
+    if fa is None:
+        fa = f(a)
+        evaluations += 1
+    if fb is None:
+        fb = f(b)
+        evaluations += 1
+    if math.isnan(fa) or math.isnan(fb):
+        raise ValueError(f"Function is undefined at an endpoint of [{a}, {b}]")
+    if fa * fb > 0:
+        raise ValueError(f"f(a) and f(b) must have opposite signs in [{a}, {b}]")
+    return fa, fb, evaluations
+
+
+def brent(f, a, b, xtol=1e-15, max_iter=100, fa=None, fb=None):
+    """Brent's method: inverse quadratic interpolation and secant steps guarded by bisection"""
+    fa, fb, evaluations = _check_bracket(f, a, b, fa, fb)
+    if fa == 0:
+        return a, 0, evaluations
+    if fb == 0:
+        return b, 0, evaluations
+
+    # b is the best estimate, a the previous one, c the contrapoint
+    c, fc = a, fa
+    d = e = b - a
+    for i in range(max_iter):
+        if fb * fc > 0:
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+
+        tol = 2 * EPS * abs(b) + 0.5 * xtol
+        m = 0.5 * (c - b)
+        if abs(m) <= tol or fb == 0:
+            return b, i, evaluations
+
+        if abs(e) >= tol and abs(fa) > abs(fb):
+            s = fb / fa
+            if a == c:
+                # Secant step
+                p = 2 * m * s
+                q = 1 - s
+            else:
+                # Inverse quadratic interpolation
+                q = fa / fc
+                r = fb / fc
+                p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            else:
+                p = -p
+            # Accept the interpolation only if it falls well inside the bracket
+            if 2 * p < min(3 * m * q - abs(tol * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = m
+        else:
+            d = e = m
+
+        a, fa = b, fb
+        b += d if abs(d) > tol else math.copysign(tol, m)
+        fb = f(b)
+        evaluations += 1
+        if math.isnan(fb):
+            return None, i + 1, evaluations
+
+    return b, max_iter, evaluations
+
+
+def illinois(f, a, b, xtol=1e-15, max_iter=100, fa=None, fb=None):
+    """Illinois variant of regula falsi: halves the stale endpoint value to avoid stagnation"""
+    fa, fb, evaluations = _check_bracket(f, a, b, fa, fb)
+    if fa == 0:
+        return a, 0, evaluations
+    if fb == 0:
+        return b, 0, evaluations
+
+    side = 0
+    c = a
+    for i in range(max_iter):
+        c = (a * fb - b * fa) / (fb - fa)
+        fc = f(c)
+        evaluations += 1
+        if math.isnan(fc):
+            return None, i + 1, evaluations
+        if fc == 0 or abs(b - a) <= 2 * EPS * abs(c) + xtol:
+            return c, i + 1, evaluations
+
+        if fc * fb > 0:
+            b, fb = c, fc
+            if side == -1:
+                fa /= 2
+            side = -1
+        else:
+            a, fa = c, fc
+            if side == 1:
+                fb /= 2
+            side = 1
+
+    return c, max_iter, evaluations
+
+
+def itp(f, a, b, xtol=1e-15, max_iter=100, fa=None, fb=None, k1=None, k2=2.0, n0=1):
+    """ITP method (Interpolate, Truncate, Project): regula falsi speed with bisection's worst case"""
+    fa, fb, evaluations = _check_bracket(f, a, b, fa, fb)
+    if fa == 0:
+        return a, 0, evaluations
+    if fb == 0:
+        return b, 0, evaluations
+    if a > b:
+        a, b, fa, fb = b, a, fb, fa
+
+    # The method needs f(a) < 0 < f(b); flip the sign of f otherwise
+    sign = 1.0
+    if fa > 0:
+        sign = -1.0
+        fa, fb = -fa, -fb
+
+    eps = 0.5 * xtol + EPS * max(abs(a), abs(b))
+    if k1 is None:
+        k1 = 0.2 / (b - a)
+    n_half = max(0, math.ceil(math.log2((b - a) / (2 * eps))))
+    n_max = n_half + n0
+
+    x = 0.5 * (a + b)
+    for i in range(max_iter):
+        if b - a <= 2 * eps:
+            return 0.5 * (a + b), i, evaluations
+
+        # Interpolation (regula falsi point)
+        x_half = 0.5 * (a + b)
+        r = eps * 2 ** (n_max - i) - 0.5 * (b - a)
+        delta = k1 * (b - a) ** k2
+        x_f = (fb * a - fa * b) / (fb - fa)
+
+        # Truncation towards the midpoint
+        sigma = math.copysign(1.0, x_half - x_f)
+        x_t = x_f + sigma * delta if delta <= abs(x_half - x_f) else x_half
+
+        # Projection onto the minmax interval around the midpoint
+        x = x_t if abs(x_t - x_half) <= r else x_half - sigma * r
+
+        fx = sign * f(x)
+        evaluations += 1
+        if math.isnan(fx):
+            return None, i + 1, evaluations
+        if fx > 0:
+            b, fb = x, fx
+        elif fx < 0:
+            a, fa = x, fx
+        else:
+            return x, i + 1, evaluations
+
+    return 0.5 * (a + b), max_iter, evaluations
+
+
+def bisection(f, a, b, xtol=1e-15, max_iter=100, fa=None, fb=None):
+    """Plain bisection, kept as the reference bracketed method"""
+    fa, fb, evaluations = _check_bracket(f, a, b, fa, fb)
+    if fa == 0:
+        return a, 0, evaluations
+    if fb == 0:
+        return b, 0, evaluations
+
+    c = 0.5 * (a + b)
+    for i in range(max_iter):
+        c = 0.5 * (a + b)
+        if abs(b - a) <= 2 * EPS * abs(c) + xtol:
+            return c, i, evaluations
+        fc = f(c)
+        evaluations += 1
+        if math.isnan(fc):
+            return None, i + 1, evaluations
+        if fc == 0:
+            return c, i + 1, evaluations
+        if fa * fc < 0:
+            b, fb = c, fc
+        else:
+            a, fa = c, fc
+
+    return c, max_iter, evaluations
+
+
+BRACKETED_SOLVERS = {
+    'brent': brent,
+    'illinois': illinois,
+    'itp': itp,
+    'bisection': bisection,
+}
+
+
+def solve_bracket(f, a, b, method='brent', xtol=1e-15, max_iter=100, fa=None, fb=None):
+    """
+    Finds a root of f inside [a, b] with the chosen bracketed method.
+    Returns (root, iterations, evaluations); root is None if f became undefined.
+    """
+    try:
+        solver = BRACKETED_SOLVERS[method]
+    except KeyError:
+        raise ValueError(f"Unknown bracketed method '{method}'. "
+                         f"Choose from: {', '.join(BRACKETED_SOLVERS)}") from None
+    return solver(f, a, b, xtol=xtol, max_iter=max_iter, fa=fa, fb=fb)
@@ -0,0 +1,174 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from tracing import DEFAULT_TRACER
+
+# Outcome of a Chebyshev solve; complete is False when some piece could not be resolved
+ChebyshevResult = namedtuple('ChebyshevResult', ['roots', 'evaluations', 'pieces', 'complete'])
+
+
+def chebyshev_points(n, a=-1.0, b=1.0):
+    """The n + 1 Chebyshev extreme points cos(pi k / n) mapped to [a, b], from b down to a"""
+    return 0.5 * (a + b) + 0.5 * (b - a) * np.cos(np.pi * np.arange(n + 1) / n)
+
+
+def chebyshev_coefficients(values):
+    """Coefficients c_k of sum c_k T_k interpolating values given at chebyshev_points(n)"""
+    n = len(values) - 1
+    if n == 0:
+        return np.array(values, dtype=float)
+    extended = np.concatenate([values, values[n - 1:0:-1]])
+    coeffs = np.real(np.fft.rfft(extended))[:n + 1] / n
+    coeffs[0] /= 2
+    coeffs[n] /= 2
+    return coeffs
+
+
+def colleague_roots(coeffs):
+    """Eigenvalues of the colleague matrix: the roots of sum c_k T_k, possibly complex"""
+    n = len(coeffs) - 1
+    if n < 1:
+        return np.array([])
+    if n == 1:
+        return np.array([-coeffs[0] / coeffs[1]])
+    matrix = np.zeros((n, n))
+    matrix[0, 1] = 1.0
+    for k in range(1, n - 1):
+        matrix[k, k - 1] = matrix[k, k + 1] = 0.5
+    matrix[n - 1, n - 2] = 0.5
+    matrix[n - 1, :] -= coeffs[:n] / (2 * coeffs[n])
+    return np.linalg.eigvals(matrix)
+
+
+def _polish(fdf, x, a, b, xtol, max_iter=50):
+    """Newton from an eigenvalue estimate; keeps the estimate when Newton leaves [a, b] or fails"""
+    best, best_residual = x, math.inf
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        fx, dfx = fdf(x)
+        if not math.isfinite(fx):
+            break
+        if abs(fx) < best_residual:
+            best, best_residual = x, abs(fx)
+        if fx == 0 or dfx == 0 or not math.isfinite(dfx):
+            break
+        step = fx / dfx
+        x -= step
+        if not a <= x <= b:
+            break
+        if abs(step) <= xtol * max(1.0, abs(x)):
+            fx, _ = fdf(x)
+            if math.isfinite(fx) and abs(fx) <= best_residual:
+                best = x
+            break
+    return best, iterations
+
+
+def chebyshev_roots(f_vec, a, b, fdf=None, tol=1e-13, min_degree=16, max_degree=128, min_width=1e-8,
+                    imag_tol=1e-6, xtol=1e-15, max_evals=100000, tracer=None):
+    """
+    All roots of a smooth f on [a, b] from Chebyshev interpolants.
+    f_vec is sampled at Chebyshev points; the degree doubles from min_degree
+    (reusing every earlier sample) until the trailing coefficients fall
+    below tol relative to the largest one. Pieces that need more than
+    max_degree, or that return NaN or infinity (or coefficients that are
+    not finite), are split in two; pieces
+    narrower than min_width are given up, which clears complete, and so does
+    running out of max_evals evaluations. On narrow pieces the tolerance is
+    raised to the rounding of the sample positions themselves, so steep
+    regions near poles do not split into noise.
+    The roots of each interpolant are the real eigenvalues (|imag| below
+    imag_tol) in [-1, 1] of its colleague matrix, mapped back and polished
+    with Newton steps when fdf (returning (f, f')) is given; eigenvalues
+    that meet at a multiple root are merged. Because nothing
+    depends on a step size, close pairs and even-multiplicity roots are
+    found, and the evaluation count follows the smoothness of f rather than
+    the width of the range.
+    Returns a ChebyshevResult with (x, iterations) pairs sorted by x.
+    """
+    tracer = tracer or DEFAULT_TRACER
+    candidates = []
+    evaluations = pieces = 0
+    complete = True
+    stack = [(a, b)]
+
+    while stack:
+        lo, hi = stack.pop()
+        if evaluations >= max_evals:
+            complete = False
+            break
+        piece_tol = max(tol, 10 * np.finfo(float).eps * max(1.0, abs(lo), abs(hi)) / (hi - lo))
+        n = min_degree
+        values = f_vec(chebyshev_points(n, lo, hi))
+        evaluations += n + 1
+        while True:
+            if not np.all(np.isfinite(values)):
+                coeffs = None
+                break
+            # The roots do not depend on the scale of f; normalizing keeps the transform from overflowing
+            peak = np.max(np.abs(values))
+            coeffs = chebyshev_coefficients(values / peak) if peak > 0 else np.zeros(n + 1)
+            scale = np.max(np.abs(coeffs))
+            if not np.all(np.isfinite(coeffs)):
+                coeffs = None
+                break
+            tail = np.abs(coeffs[-max(3, n // 8):])
+            if scale == 0 or np.max(tail) <= piece_tol * scale:
+                break
+            if 2 * n > max_degree:
+                coeffs = None
+                break
+            # The points of degree 2n interleave the previous ones: only the odd ones are new
+            odd = f_vec(chebyshev_points(2 * n, lo, hi)[1::2])
+            evaluations += n
+            merged = np.empty(2 * n + 1)
+            merged[0::2], merged[1::2] = values, odd
+            values, n = merged, 2 * n
+
+        if coeffs is None:
+            if not np.any(np.isfinite(values)):
+                continue  # outside the domain of f altogether: no roots, nothing to split
+            if hi - lo <= min_width * max(1.0, abs(lo), abs(hi)):
+                complete = False
+                if tracer.per_iteration:
+                    print(f"Giving up on [{lo:.6g}, {hi:.6g}]: not resolved at the minimum width")
+                continue
+            # Split slightly off-centre so symmetric functions do not put a root on the seam
+            mid = lo + 0.5001 * (hi - lo)
+            stack.extend([(mid, hi), (lo, mid)])
+            continue
+
+        pieces += 1
+        scale = np.max(np.abs(coeffs))
+        if scale == 0:
+            continue  # f vanishes identically here; there are no isolated roots to report
+        significant = np.flatnonzero(np.abs(coeffs) > piece_tol * scale)
+        coeffs = coeffs[:significant[-1] + 1]
+        if tracer.per_iteration:
+            print(f"Piece [{lo:.6g}, {hi:.6g}]: degree {len(coeffs) - 1}")
+        for t in colleague_roots(coeffs):
+            if abs(t.imag) <= imag_tol and -1 - 1e-8 <= t.real <= 1 + 1e-8:
+                x = 0.5 * (lo + hi) + 0.5 * (hi - lo) * min(1.0, max(-1.0, t.real))
+                candidates.append(x)
+
+    polished = []
+    for x in candidates:
+        iterations = 0
+        if fdf is not None:
+            x, iterations = _polish(fdf, x, a, b, xtol)
+        polished.append((float(x) + 0.0, iterations))
+    polished.sort()
+
+    # A root of multiplicity m shows up as m eigenvalues a few sqrt(eps) apart: keep one of them
+    roots = []
+    for x, iterations in polished:
+        if roots and abs(x - roots[-1][0]) <= 1e-7 * max(1.0, abs(x)):
+            if fdf is not None and abs(fdf(x)[0]) < abs(fdf(roots[-1][0])[0]):
+                roots[-1] = (x, iterations)
+            continue
+        roots.append((x, iterations))
+    if tracer.summary:
+        print(f"Chebyshev: {len(roots)} candidate roots from {pieces} pieces, {evaluations} evaluations")
+    return ChebyshevResult(roots, evaluations, pieces, complete)
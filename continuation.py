@@ -0,0 +1,219 @@
+import ast
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from autodiff import compile_jacobian
+from deepseek_conjunto import find_root_set
+from expression_compiler import (CachedFunction, compile_expression, compile_vectorized, ignore_error,
+                                 parse_expression)
+from tracing import DEFAULT_TRACER, SILENT, Tracer
+
+# branches[i][k] is the x of branch i at parameter_values[k] (NaN where the branch does not exist)
+SweepResult = namedtuple('SweepResult', ['parameter_values', 'branches', 'rescans', 'newton_steps',
+                                         'evaluations'])
+
+
+def bind_parameter(expr: str, parameter: str, value: float):
+    """Returns the expression with the parameter replaced by a numeric constant"""
+    tree = parse_expression(expr, ('x', parameter))
+
+    class _Bind(ast.NodeTransformer):
+        def visit_Name(self, node):
+            if node.id != parameter:
+                return node
+            constant = ast.Constant(abs(float(value)))
+            return ast.UnaryOp(ast.USub(), constant) if value < 0 else constant
+
+    return ast.unparse(_Bind().visit(tree).body)
+
+
+def _stencil(f_vec, x, p):
+    """f, the central f_x and f_xx at the points x from one call (x, x + h and x - h together)"""
+    h = 1e-4 * np.maximum(1.0, np.abs(x))
+    values = f_vec(np.concatenate([x, x + h, x - h]), p)
+    n = len(x)
+    y, right, left = values[:n], values[n:2 * n], values[2 * n:]
+    return y, (right - left) / (2 * h), (right - 2 * y + left) / (h * h)
+
+
+def _find_extrema(f_vec, xs, p, steps=4):
+    """
+    Local extrema of f(., p) between the probe points xs: cells where the
+    central-difference f_x changes sign hold one. Each is located by
+    safeguarded Newton steps on f_x, started from the regula falsi point and
+    stopped once the quadratic model leaves the sign of the extremum in no
+    doubt, which away from folds is after the first stencil.
+    Returns (positions, values, evaluations).
+    """
+    _, slopes, _ = _stencil(f_vec, xs, p)
+    evaluations = 3 * len(xs)
+    # A zero slope counts as positive, so an extremum on a probe point falls in exactly one cell
+    negative = slopes < 0
+    finite = np.isfinite(slopes)
+    cells = np.flatnonzero((negative[:-1] != negative[1:]) & finite[:-1] & finite[1:])
+    lo, hi = xs[cells], xs[cells + 1]
+    slope_lo, slope_hi = slopes[cells], slopes[cells + 1]
+    critical = lo - slope_lo * (hi - lo) / (slope_hi - slope_lo)
+    extremum = np.empty(0)
+    for _ in range(steps if len(cells) else 0):
+        value, slope, curvature = _stencil(f_vec, critical, p)
+        evaluations += 3 * len(cells)
+        with np.errstate(all='ignore'):
+            correction = slope * slope / (2 * curvature)
+            extremum = value - correction
+        if np.all(np.abs(extremum) > 2 * np.abs(correction)):
+            break
+        # Keep the bracket of the sign change of f_x and fall back to its midpoint
+        left = slope_lo * slope > 0
+        lo, slope_lo = np.where(left, critical, lo), np.where(left, slope, slope_lo)
+        hi = np.where(left, hi, critical)
+        with np.errstate(all='ignore'):
+            step = critical - slope / curvature
+        critical = np.where((lo < step) & (step < hi), step, 0.5 * (lo + hi))
+    return critical, extremum, evaluations
+
+
+def _follow_extrema(f_vec, critical, p, cell, steps=4):
+    """
+    Moves the extrema found at the previous parameter value to p with Newton
+    steps on f_x; usually one stencil is enough. Returns (positions, values,
+    evaluations), with positions None when an extremum is lost (it vanished,
+    or Newton jumped further than a probe cell), so the caller probes again.
+    """
+    evaluations = 0
+    for _ in range(steps):
+        value, slope, curvature = _stencil(f_vec, critical, p)
+        evaluations += 3 * len(critical)
+        with np.errstate(all='ignore'):
+            step = slope / curvature
+            extremum = value - step * slope / 2
+        if not np.all(np.isfinite(extremum) & (np.abs(step) < cell)):
+            return None, None, evaluations
+        critical = critical - step
+        if np.all(np.abs(step) <= 1e-6 * cell):
+            break
+    return critical, extremum, evaluations
+
+
+def _sign_changes(values):
+    """Sign changes along values, skipping zeros and NaN"""
+    values = values[np.isfinite(values) & (values != 0)]
+    return int(np.count_nonzero(values[:-1] * values[1:] < 0))
+
+
+def _corrector(fj, x, p, xtol, max_iter):
+    """Newton in x at fixed p; returns (x, converged, steps)"""
+    for i in range(max_iter):
+        values, rows = fj(x, p)
+        if values is None:
+            return x, False, i + 1
+        fx, dfx = values[0], rows[0][0]
+        if not math.isfinite(fx) or dfx == 0 or not math.isfinite(dfx):
+            return x, False, i + 1
+        x_new = x - fx / dfx
+        if abs(x_new - x) <= xtol * max(1.0, abs(x_new)) or fx == 0:
+            return x_new, True, i + 1
+        x = x_new
+    return x, False, max_iter
+
+
+def sweep(expr, parameter_values, parameter='p', search_range=(-100, 100), rescan_every=None,
+          probe_points=201, probe_every=100, match_tol=1e-6, xtol=1e-14, max_newton=20, tracer=None,
+          **options):
+    """
+    Follows the roots of f(x, p) = 0 in x while p runs through parameter_values.
+    The expression is compiled once with x and the parameter as arguments.
+    A full find_root_set scan runs at the first value; afterwards each root is
+    continued: an Euler predictor along dx/dp = -f_p / f_x (both from automatic
+    differentiation) seeds a Newton corrector at the next parameter value.
+    The full scan is repeated only when a branch is lost (Newton fails or two
+    branches merge), when the number of sign changes of f along the ends of
+    search_range and its local extrema in x changes, or every rescan_every
+    values if given. Roots appear and vanish in pairs exactly where an
+    extremum crosses zero, however close together the pair is. The extrema
+    are located on a grid of probe_points (see _find_extrema) at the first
+    value, every probe_every values and whenever one is lost, and are
+    otherwise continued like the roots, at one Newton stencil each; only
+    extrema born closer together than the grid step can still hide a pair
+    until the next probe. Extra keyword arguments go to find_root_set.
+    Returns a SweepResult whose branches are arrays aligned with parameter_values.
+    """
+    tracer = tracer or DEFAULT_TRACER
+    values = np.asarray(parameter_values, dtype=float)
+    variables = ('x', parameter)
+    fj = compile_jacobian([expr], variables, ignore_error)
+    f_vec = compile_vectorized(expr, variables) if probe_points else None
+    probe_xs = np.linspace(search_range[0], search_range[1], probe_points) if probe_points else None
+    ends = np.array(search_range, dtype=float)
+    extrema = None
+
+    branches = []
+    active = {}  # branch index -> (x, dx/dp)
+    rescans = newton_steps = evaluations = 0
+    previous_changes = None
+
+    for k, p in enumerate(values):
+        lost = False
+
+        # Continue the known branches: predictor along the tangent, Newton corrector
+        for index, (x, slope) in list(active.items()):
+            x_pred = x + slope * (p - values[k - 1])
+            x_new, ok, steps = _corrector(fj, x_pred, p, xtol, max_newton)
+            newton_steps += steps
+            evaluations += steps
+            duplicate = any(abs(branches[j][k] - x_new) < match_tol for j in active if j != index
+                            and not math.isnan(branches[j][k]))
+            if not ok or duplicate or not search_range[0] <= x_new <= search_range[1]:
+                del active[index]
+                lost = True
+                continue
+            _, rows = fj(x_new, p)
+            evaluations += 1
+            dfx, dfp = rows[0] if rows else (0.0, 0.0)
+            branches[index][k] = x_new
+            active[index] = (x_new, -dfp / dfx if dfx else 0.0)
+
+        # Cheap detector for roots appearing or vanishing in pairs: the signs at the extrema and the ends
+        changed = False
+        if probe_points:
+            if extrema is not None and not (probe_every and k % probe_every == 0):
+                extrema, extremum, probe_evaluations = _follow_extrema(f_vec, extrema, p, probe_xs[1] - probe_xs[0])
+                evaluations += probe_evaluations
+            if extrema is None or probe_every and k % probe_every == 0:
+                extrema, extremum, probe_evaluations = _find_extrema(f_vec, probe_xs, p)
+                evaluations += probe_evaluations
+            inside = (extrema > ends[0]) & (extrema < ends[1])
+            order = np.argsort(extrema[inside])
+            changes = _sign_changes(np.concatenate([f_vec(ends[:1], p), extremum[inside][order],
+                                                    f_vec(ends[1:], p)]))
+            evaluations += 2
+            changed = previous_changes is not None and changes != previous_changes
+            previous_changes = changes
+
+        periodic = rescan_every and k % rescan_every == 0
+        if k == 0 or lost or changed or periodic:
+            rescans += 1
+            f = CachedFunction(compile_expression(bind_parameter(expr, parameter, p), ignore_error))
+            roots = find_root_set(f, search_range, tracer=Tracer(SILENT), **options).xs
+            evaluations += f.cache_info().misses
+            if tracer.per_iteration:
+                print(f"{parameter} = {p:.6g}: full scan found {len(roots)} roots")
+
+            # Start new branches for roots no continued branch accounts for
+            for root in roots:
+                if any(abs(x - root) < match_tol for x, _ in active.values()):
+                    continue
+                branch = np.full(len(values), np.nan)
+                branch[k] = root
+                branches.append(branch)
+                _, rows = fj(root, p)
+                evaluations += 1
+                dfx, dfp = rows[0] if rows else (0.0, 0.0)
+                active[len(branches) - 1] = (root, -dfp / dfx if dfx else 0.0)
+
+    if tracer.summary:
+        print(f"Sweep over {len(values)} values of {parameter}: {len(branches)} branches, "
+              f"{rescans} full scans, {newton_steps} Newton steps")
+    return SweepResult(values, branches, rescans, newton_steps, evaluations)
@@ -1,29 +1,33 @@
 import sys
 import math
-import re
-import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-def convert_power_notation(expr_str):
-    """Converts all power notations to Python syntax (base**exponent)"""
-    # Unicode exponents
-    unicode_subs = {
-        '²': '**2', '³': '**3', '⁴': '**4', '⁵': '**5', 
-        '⁶': '**6', '⁷': '**7', '⁸': '**8', '⁹': '**9', '⁰': '**0'
-    }
-    for char, repl in unicode_subs.items():
-        expr_str = expr_str.replace(char, repl)
-    
-    # Circumflex notation
-    expr_str = re.sub(r'(\d*\.?\d+|\b\w+|[\)])\s*\^\s*(\d*\.?\d+|\b\w+|[\()])', r'\1**\2', expr_str)
-    
-    # Implicit multiplication
-    expr_str = re.sub(r'(\d)([a-zA-Z\(])', r'\1*\2', expr_str)
-    expr_str = re.sub(r'([a-zA-Z\)])(\d)', r'\1*\2', expr_str)
-    
-    return expr_str
+from expression_compiler import (CachedFunction, EvaluationBudget, compile_expression, compile_vectorized,
+                                 convert_power_notation, ignore_error, parse_expression, _report_error)
+from autodiff import compile_with_derivative
+from bracketed_solvers import BRACKETED_SOLVERS, solve_bracket
+from open_solvers import OPEN_SOLVERS, solve_open
+from polynomial import horner, polynomial_coefficients, polynomial_roots
+from root_set import Root, RootSet
+from interval_arithmetic import Interval, branch_and_prune, compile_interval
+from metrics import DISABLED
+from muller import compile_complex, find_roots_by_deflation
+from tracing import DEFAULT_TRACER, SILENT, Tracer
 
-def string_to_function(expr: str):
+def string_to_function(expr: str, compiled=True, vectorized=False, cache_size=None):
     """Converts a math expression string to an executable Python function"""
+    # Vectorized mode evaluates NumPy arrays in one call (domain errors become NaN)
+    if vectorized:
+        return compile_vectorized(expr)
+    # Optional LRU memoization of f(x), shared by everything that receives f
+    if cache_size:
+        return CachedFunction(string_to_function(expr, compiled), maxsize=cache_size)
+    # Compiled mode parses and validates once; the eval mode re-parses on every call
+    if compiled:
+        return compile_expression(expr)
+    
+    # Validate once so the eval below only ever sees whitelisted, bounded syntax
+    parse_expression(expr)
     env = {
         'sin': math.sin, 'cos': math.cos, 'tan': math.tan,
         'asin': math.asin, 'acos': math.acos, 'atan': math.atan,
@@ -45,9 +49,15 @@ def string_to_function(expr: str):
     
     return f
 
-def find_sign_change_intervals(f, min_val=-100, max_val=100, step=0.5):
-    """Finds all intervals where the function changes sign or approaches zero"""
-    print(f"\nSearching for intervals from {min_val} to {max_val}...")
+def find_sign_change_intervals(f, min_val=-100, max_val=100, step=0.5, tracer=None, check_critical=True):
+    """
+    Finds all intervals where the function changes sign or approaches zero.
+    check_critical=False returns sign changes only, for callers that find
+    roots without a sign change by other means.
+    """
+    tracer = tracer or DEFAULT_TRACER
+    if tracer.summary:
+        print(f"\nSearching for intervals from {min_val} to {max_val}...")
     
     intervals = []
     x_prev = min_val
@@ -70,7 +80,8 @@ def find_sign_change_intervals(f, min_val=-100, max_val=100, step=0.5):
         # Check for sign change
         if f_prev * f_current < 0:
             intervals.append((x_prev, x_current))
-            print(f"Sign change found between {x_prev:.2f} and {x_current:.2f}")
+            if tracer.per_iteration:
+                print(f"Sign change found between {x_prev:.2f} and {x_current:.2f}")
         
         # Check for critical points (where derivative might be zero)
         if abs(f_current) < abs(f_prev) and abs(f_current) < 10:
@@ -81,20 +92,199 @@ def find_sign_change_intervals(f, min_val=-100, max_val=100, step=0.5):
         x_current += step
     
     # If no sign changes found, check critical points
-    if not intervals and critical_points:
-        print("No sign changes found. Checking critical points...")
+    if not intervals and critical_points and check_critical:
+        if tracer.summary:
+            print("No sign changes found. Checking critical points...")
         for cp in critical_points:
             if abs(f(cp)) < 10:  # Arbitrary threshold
                 intervals.append((cp - step, cp + step))
     
     return intervals
 
+def find_sign_change_intervals_vectorized(f_vec, min_val=-100, max_val=100, step=0.5, tracer=None,
+                                          check_critical=True):
+    """Array version of find_sign_change_intervals: evaluates the whole grid in one call"""
+    import numpy as np  # only needed by the vectorized scan
+    
+    tracer = tracer or DEFAULT_TRACER
+    if tracer.summary:
+        print(f"\nSearching for intervals from {min_val} to {max_val}...")
+    
+    n_points = int(math.floor((max_val - min_val) / step + 1e-9)) + 1
+    xs = min_val + step * np.arange(n_points)
+    ys = f_vec(xs)
+    
+    # Pairs of consecutive points where both values are defined
+    valid = ~np.isnan(ys[:-1]) & ~np.isnan(ys[1:])
+    y_prev, y_curr = ys[:-1], ys[1:]
+    
+    # Sign changes between consecutive grid points
+    sign_change = valid & (y_prev * y_curr < 0)
+    idx = np.flatnonzero(sign_change)
+    intervals = [(float(xs[i]), float(xs[i + 1])) for i in idx]
+    if tracer.per_iteration:
+        for a, b in intervals:
+            print(f"Sign change found between {a:.2f} and {b:.2f}")
+    
+    # Near-zero candidates (decreasing |f| below the threshold), used like critical points
+    if not intervals and check_critical:
+        near_zero = valid & (np.abs(y_curr) < np.abs(y_prev)) & (np.abs(y_curr) < 10)
+        critical_points = xs[1:][near_zero]
+        if critical_points.size:
+            if tracer.summary:
+                print("No sign changes found. Checking critical points...")
+            intervals = [(float(cp - step), float(cp + step)) for cp in critical_points]
+    
+    return intervals
+
+def find_sign_change_intervals_adaptive(f, min_val=-100, max_val=100, initial_points=257,
+                                        min_step=None, max_evals=2000, safety=2.0, tracer=None):
+    """
+    Finds intervals with sign changes using a locally refined step.
+    Starting from a coarse grid, a segment is halved when |f| at its ends is
+    small compared to the local slope times its width (f could reach zero
+    inside it), and more eagerly when the sampled slope changes sign around it
+    (close pairs of roots and touching roots). Smooth regions far from zero
+    keep the coarse step. max_evals caps the total number of evaluations and
+    min_step (default: a millionth of the range) the refinement depth.
+    """
+    tracer = tracer or DEFAULT_TRACER
+    if tracer.summary:
+        print(f"\nAdaptive search for intervals from {min_val} to {max_val}...")
+    
+    if min_step is None:
+        min_step = (max_val - min_val) * 1e-6
+    
+    xs = [min_val + (max_val - min_val) * i / (initial_points - 1) for i in range(initial_points)]
+    ys = [f(x) for x in xs]
+    evals = len(xs)
+    
+    # Left end of a sign-change segment -> number of successive halvings where |f|
+    # grew towards the middle; after three it is treated as a pole and left alone
+    pole_hits = {}
+    
+    while evals < max_evals:
+        n = len(xs)
+        slopes = [(ys[i+1] - ys[i]) / (xs[i+1] - xs[i]) for i in range(n - 1)]
+        
+        # Score every segment: small score means a root could hide inside
+        candidates = []
+        for i in range(n - 1):
+            fa, fb, w = ys[i], ys[i+1], xs[i+1] - xs[i]
+            if w <= min_step:
+                continue
+            if math.isnan(fa) != math.isnan(fb):
+                # Edge of the domain (log, sqrt, ...): locate it, roots often sit next to it
+                candidates.append((1.0, i))
+                continue
+            if math.isnan(fa):
+                continue
+            s_prev = slopes[i-1] if i > 0 and not math.isnan(slopes[i-1]) else slopes[i]
+            s_next = slopes[i+1] if i < n - 2 and not math.isnan(slopes[i+1]) else slopes[i]
+            lipschitz = max(abs(s_prev), abs(slopes[i]), abs(s_next))
+            extremum = s_prev * slopes[i] < 0 or slopes[i] * s_next < 0 or s_prev * s_next < 0
+            nonlinear = max(abs(s_prev - slopes[i]), abs(s_next - slopes[i])) > 0.5 * abs(slopes[i])
+            score = min(abs(fa), abs(fb)) / (lipschitz * w + 1e-300)
+            if fa == 0 or fb == 0:
+                # Exact zero at an end: look for neighbouring roots only where f bends
+                if extremum or nonlinear:
+                    candidates.append((max(abs(fa), abs(fb)) / (lipschitz * w + 1e-300), i))
+            elif fa * fb < 0:
+                # A sign change holds at least one root; split it while f is not
+                # locally linear, since it may hide three roots
+                if (extremum or nonlinear) and pole_hits.get(xs[i], 0) < 3:
+                    candidates.append((score, i))
+            elif score < (2 * safety if extremum or nonlinear else safety):
+                candidates.append((score, i))
+        
+        if not candidates:
+            break
+        
+        # Spend the remaining budget on the most suspicious segments first
+        candidates.sort()
+        split = sorted(i for _, i in candidates[:max_evals - evals])
+        new_xs, new_ys = [], []
+        last = 0
+        for i in split:
+            new_xs.extend(xs[last:i+1])
+            new_ys.extend(ys[last:i+1])
+            mid = 0.5 * (xs[i] + xs[i+1])
+            f_mid = f(mid)
+            new_xs.append(mid)
+            new_ys.append(f_mid)
+            last = i + 1
+            # |f| growing towards the middle of a sign change indicates a pole
+            if ys[i] * ys[i+1] < 0 and abs(f_mid) > max(abs(ys[i]), abs(ys[i+1])):
+                pole_hits[xs[i] if f_mid * ys[i] < 0 else mid] = pole_hits.get(xs[i], 0) + 1
+        new_xs.extend(xs[last:])
+        new_ys.extend(ys[last:])
+        xs, ys = new_xs, new_ys
+        evals += len(split)
+    
+    # Collect sign changes, exact zeros and touching candidates (local minima of |f|)
+    intervals = []
+    n = len(xs)
+    for i in range(n):
+        if ys[i] == 0:
+            intervals.append((xs[i], xs[i]))
+            if tracer.per_iteration:
+                print(f"Exact root found at {xs[i]:.6f}")
+        elif i < n - 1 and ys[i] * ys[i+1] < 0:
+            intervals.append((xs[i], xs[i+1]))
+            if tracer.per_iteration:
+                print(f"Sign change found between {xs[i]:.6f} and {xs[i+1]:.6f}")
+        elif 0 < i < n - 1 and abs(ys[i]) < abs(ys[i-1]) and abs(ys[i]) < abs(ys[i+1]) \
+                and ys[i-1] * ys[i] > 0 and ys[i] * ys[i+1] > 0:
+            # |f| dips without crossing: possible even-multiplicity root
+            slope = max(abs(ys[i] - ys[i-1]) / (xs[i] - xs[i-1]), abs(ys[i+1] - ys[i]) / (xs[i+1] - xs[i]))
+            if abs(ys[i]) < safety * slope * (xs[i+1] - xs[i-1]):
+                intervals.append((xs[i-1], xs[i+1]))
+    
+    if tracer.summary:
+        print(f"Adaptive scan used {evals} evaluations ({n - 1} segments)")
+    return intervals
+
+def find_sign_change_intervals_pruned(expr, min_val=-100, max_val=100, max_boxes=2000, tracer=None):
+    """
+    Candidate intervals from interval-arithmetic branch and prune.
+    Regions where the enclosure of f excludes zero are discarded without
+    sampling, so the cost follows the number of roots rather than the width
+    of the range, and no root can lie outside the returned intervals unless
+    the box budget ran out.
+    """
+    tracer = tracer or DEFAULT_TRACER
+    if tracer.summary:
+        print(f"\nPruning [{min_val}, {max_val}] with interval arithmetic...")
+    
+    F = compile_interval(expr)
+    result = branch_and_prune(F, min_val, max_val, max_boxes=max_boxes, fdf=compile_interval(expr, derivative=True))
+    if tracer.per_iteration:
+        for (a, b), unique in zip(result.intervals, result.certified):
+            print(f"{'Single root certified' if unique else 'Possible root'} in [{a:.6g}, {b:.6g}]")
+    if tracer.summary:
+        print(f"{len(result.intervals)} candidate intervals ({sum(result.certified)} certified) "
+              f"after {result.boxes} interval evaluations")
+        if not result.complete:
+            print("Box budget exhausted: unexplored regions are returned as candidates")
+    
+    # Small boxes without a sign change (double roots) are refined by Newton from their midpoint
+    intervals = []
+    for (a, b), unique in zip(result.intervals, result.certified):
+        ya, yb = F(Interval(a)), F(Interval(b))
+        if unique or ya.hi < 0 < yb.lo or yb.hi < 0 < ya.lo or b - a > 1e-3 * max(1.0, abs(a), abs(b)):
+            intervals.append((a, b))
+        else:
+            intervals.append((0.5 * (a + b), 0.5 * (a + b)))
+    return intervals
+
 def numerical_derivative(f, x, h=1e-5):
     """Calculates numerical derivative using central differences"""
     return (f(x + h) - f(x - h)) / (2 * h)
 
-def bisection_newton_hybrid(f, df, a, b, tol_bisection=1e-8, tol_newton=1e-15, max_iter=100):
+def bisection_newton_hybrid(f, df, a, b, tol_bisection=1e-8, tol_newton=1e-15, max_iter=100, fdf=None,
+                            tracer=None):
     """Hybrid root-finding algorithm combining bisection and Newton-Raphson"""
+    tracer = tracer or DEFAULT_TRACER
     # Initial function evaluations
     fa, fb = f(a), f(b)
     
@@ -108,12 +298,14 @@ def bisection_newton_hybrid(f, df, a, b, tol_bisection=1e-8, tol_newton=1e-15, m
     if fa * fb >= 0:
         # No sign change, check if we're dealing with a function like x²
         if abs(fa) < 10 and abs(fb) < 10:
-            print("No sign change but function values are small. Trying Newton-Raphson from midpoint.")
+            if tracer.summary:
+                print("No sign change but function values are small. Trying Newton-Raphson from midpoint.")
             x0 = (a + b) / 2
-            root, iters = newton_raphson(f, df, x0, tol_newton, max_iter)
+            root, iters = newton_raphson(f, df, x0, tol_newton, max_iter, fdf=fdf, tracer=tracer)
             return root, iters, 'newton'
         else:
-            print("No sign change and function values are not small. No root found in this interval.")
+            if tracer.summary:
+                print("No sign change and function values are not small. No root found in this interval.")
             return None, 0, 'no_root'
     
     iteration = 0
@@ -124,14 +316,19 @@ def bisection_newton_hybrid(f, df, a, b, tol_bisection=1e-8, tol_newton=1e-15, m
         fc = f(c)
         
         if math.isnan(fc):
-            print("NaN encountered during bisection. Aborting.")
+            if tracer.summary:
+                print("NaN encountered during bisection. Aborting.")
             return None, iteration, 'error'
             
-        print(f"Bisection iter {iteration+1}: a={a:.6f}, b={b:.6f}, c={c:.6f}, f(c)={fc:.6e}")
+        if tracer.per_iteration:
+            print(f"Bisection iter {iteration+1}: a={a:.6f}, b={b:.6f}, c={c:.6f}, f(c)={fc:.6e}")
+        if tracer.recording:
+            tracer.record('bisection', iteration+1, c, fc, a, b)
         
         # Check for convergence
         if abs(fc) < tol_bisection:
-            print(f"Bisection converged after {iteration+1} iterations")
+            if tracer.summary:
+                print(f"Bisection converged after {iteration+1} iterations")
             return c, iteration, 'bisection'
             
         # Update interval
@@ -142,101 +339,499 @@ def bisection_newton_hybrid(f, df, a, b, tol_bisection=1e-8, tol_newton=1e-15, m
             
         # Check interval size
         if abs(b - a) < tol_bisection:
-            print(f"Small interval after {iteration+1} bisection iterations")
+            if tracer.summary:
+                print(f"Small interval after {iteration+1} bisection iterations")
             break
             
         iteration += 1
     
     # Newton-Raphson phase starting from bisection result
     x0 = (a + b) / 2
-    print(f"\nStarting Newton-Raphson from x0 = {x0:.6f}")
-    root, newton_iters = newton_raphson(f, df, x0, tol_newton, max_iter - iteration)
+    if tracer.summary:
+        print(f"\nStarting Newton-Raphson from x0 = {x0:.6f}")
+    root, newton_iters = newton_raphson(f, df, x0, tol_newton, max_iter - iteration, fdf=fdf, tracer=tracer)
     
     return root, iteration + newton_iters, 'hybrid'
 
-def newton_raphson(f, df, x0, tol=1e-15, max_iter=50):
+def make_derivative(f):
+    """
+    Returns fdf(x) -> (f(x), f'(x)): exact for compiled expressions, central
+    differences otherwise. The compiled fdf reports errors with f's on_error.
+    """
+    if hasattr(f, 'expr'):
+        try:
+            return compile_with_derivative(f.expr, on_error=getattr(f, 'on_error', _report_error))
+        except ValueError:
+            pass
+    return lambda x: (f(x), numerical_derivative(f, x))
+
+def newton_raphson(f, df, x0, tol=1e-15, max_iter=50, fdf=None, tracer=None):
     """Newton-Raphson method for root finding"""
+    tracer = tracer or DEFAULT_TRACER
+    if fdf is None and df is None:
+        fdf = make_derivative(f)
+    if fdf is not None:
+        return newton_raphson_fdf(fdf, x0, tol, max_iter, tracer=tracer)
+    
     x = x0
+    fx = f(x)
     for i in range(max_iter):
-        fx = f(x)
         dfx = df(x)
         
         # Check derivative
         if abs(dfx) < 1e-15:
-            print(f"Small derivative ({dfx:.2e}) at iter {i+1}. Using current estimate.")
+            if tracer.summary:
+                print(f"Small derivative ({dfx:.2e}) at iter {i+1}. Using current estimate.")
             return x, i+1
             
         # Newton step
         x_new = x - fx / dfx
         fx_new = f(x_new)
         
-        print(f"Newton iter {i+1}: x={x_new:.16e}, f(x)={fx_new:.16e}")
+        if tracer.per_iteration:
+            print(f"Newton iter {i+1}: x={x_new:.16e}, f(x)={fx_new:.16e}")
+        if tracer.recording:
+            tracer.record('newton', i+1, x_new, fx_new)
         
         # Check convergence
         if abs(fx_new) < tol or abs(x_new - x) < tol:
-            print(f"Newton converged after {i+1} iterations")
+            if tracer.summary:
+                print(f"Newton converged after {i+1} iterations")
             return x_new, i+1
-            
-        x = x_new
+        
+        # f at the new point is the value the next iteration starts from
+        x, fx = x_new, fx_new
     
-    print(f"Newton-Raphson reached max iterations ({max_iter})")
+    if tracer.summary:
+        print(f"Newton-Raphson reached max iterations ({max_iter})")
     return x, max_iter
 
-def find_all_roots(f, search_range=(-100, 100), step=0.5, tol=1e-10):
-    """Finds all roots of a function within a given range"""
-    # Create derivative function
-    df = lambda x: numerical_derivative(f, x)
-    
-    # Find intervals with sign changes or critical points
-    intervals = find_sign_change_intervals(f, search_range[0], search_range[1], step)
+def newton_raphson_fdf(fdf, x0, tol=1e-15, max_iter=50, tracer=None):
+    """Newton-Raphson using fdf(x) -> (f(x), f'(x)): one evaluation per iteration"""
+    tracer = tracer or DEFAULT_TRACER
+    x = x0
+    fx, dfx = fdf(x)
+    for i in range(max_iter):
+        # Check derivative
+        if abs(dfx) < 1e-15:
+            if tracer.summary:
+                print(f"Small derivative ({dfx:.2e}) at iter {i+1}. Using current estimate.")
+            return x, i+1
+        
+        # Newton step; f and f' at the new point are reused by the next iteration
+        x_new = x - fx / dfx
+        fx_new, dfx_new = fdf(x_new)
+        
+        if tracer.per_iteration:
+            print(f"Newton iter {i+1}: x={x_new:.16e}, f(x)={fx_new:.16e}")
+        if tracer.recording:
+            tracer.record('newton', i+1, x_new, fx_new)
+        
+        # Check convergence
+        if abs(fx_new) < tol or abs(x_new - x) < tol:
+            if tracer.summary:
+                print(f"Newton converged after {i+1} iterations")
+            return x_new, i+1
+        
+        x, fx, dfx = x_new, fx_new, dfx_new
     
-    if not intervals:
-        print("No intervals found. Trying to find roots using Newton-Raphson at sample points.")
-        # Sample function at various points and try Newton-Raphson
-        sample_points = np.linspace(search_range[0], search_range[1], 20)
-        intervals = [(x, x) for x in sample_points]
+    if tracer.summary:
+        print(f"Newton-Raphson reached max iterations ({max_iter})")
+    return x, max_iter
+
+def newton_raphson_vectorized(fdf_vec, x0, tol=1e-15, max_iter=50, tracer=None):
+    """
+    Newton-Raphson from many starting points at once.
+    fdf_vec maps an array to the arrays (f, f'), as built by
+    compile_with_derivative(expr, vectorized=True). Each step evaluates it once
+    on the lanes still running; lanes that converged, reached a near-zero
+    derivative or left the domain are masked out. Returns the arrays
+    (roots, iterations, converged); lanes that left the domain hold NaN.
+    """
+    import numpy as np  # only needed by the vectorized engine
     
-    roots = []
-    iterations_per_root = []
-    methods = []
+    tracer = tracer or DEFAULT_TRACER
+    x = np.array(x0, dtype=float).ravel()
+    iterations = np.zeros(x.size, dtype=int)
+    converged = np.zeros(x.size, dtype=bool)
+    lanes = np.arange(x.size)
+    xs = x.copy()
+    fx, dfx = fdf_vec(xs)
     
-    # Process each interval
-    for i, (a, b) in enumerate(intervals):
-        print(f"\nProcessing interval {i+1}: [{a:.2f}, {b:.2f}]")
+    for i in range(max_iter):
+        # Stop lanes that left the domain or sit on a flat spot (kept as estimates)
+        undefined = ~np.isfinite(fx)
+        x[lanes[undefined]] = np.nan
+        keep = ~undefined & (np.abs(dfx) >= 1e-15)
+        lanes, xs, fx, dfx = lanes[keep], xs[keep], fx[keep], dfx[keep]
+        if lanes.size == 0:
+            break
         
-        if a == b:
-            # Single point - use as starting point for Newton-Raphson
-            root, iters = newton_raphson(f, df, a)
-            method = 'newton'
-        else:
-            # Interval - use hybrid method
-            root, iters, method = bisection_newton_hybrid(f, df, a, b)
+        x_new = xs - fx / dfx
+        fx_new, dfx_new = fdf_vec(x_new)
+        x[lanes] = x_new
+        iterations[lanes] = i + 1
         
-        if root is not None:
-            # Check if this root is distinct from previous ones
-            is_distinct = True
-            for existing_root in roots:
-                if abs(root - existing_root) < tol:
-                    is_distinct = False
-                    print(f"Root at {root:.8f} is similar to existing root {existing_root:.8f}")
-                    break
+        # A small residual only counts once the steps have become small too, so lanes
+        # drifting along an asymptote (exp(x) for x -> -inf) are not reported as roots
+        step = np.abs(x_new - xs)
+        done = ((np.abs(fx_new) < tol) & (step <= 1e-6 * np.maximum(1.0, np.abs(x_new)))) | (step < tol)
+        converged[lanes[done]] = True
+        keep = ~done
+        lanes, xs, fx, dfx = lanes[keep], x_new[keep], fx_new[keep], dfx_new[keep]
+    
+    if tracer.summary:
+        print(f"Vectorized Newton: {int(converged.sum())} of {x.size} starting points converged "
+              f"(at most {int(iterations.max(initial=0))} iterations)")
+    return x, iterations, converged
+
+def refine_interval(f, df, fdf, a, b, bracket_method='brent', tracer=None, xtol=1e-15, open_method=None):
+    """
+    Refines one interval (or a single start point when a == b) into
+    (root, iterations, method, evaluations); evaluations is None for the
+    hybrid and legacy Newton paths, which do not count them.
+    With open_method, single points and sign-change intervals go to that
+    open solver first, starting from the endpoint values already computed;
+    a result outside the interval falls back to the bracketed solver.
+    """
+    tracer = tracer or DEFAULT_TRACER
+    if a == b:
+        if open_method is not None:
+            root, iters, evals = solve_open(f, a, open_method, xtol=xtol, fdf=fdf)
+            return root, iters, open_method, evals
+        # Single point - use as starting point for Newton-Raphson
+        root, iters = newton_raphson(f, df, a, tol=xtol, fdf=fdf, tracer=tracer)
+        return root, iters, 'newton', None
+    if bracket_method == 'hybrid':
+        # Interval - use hybrid method
+        return (*bisection_newton_hybrid(f, df, a, b, tol_newton=xtol, fdf=fdf, tracer=tracer), None)
+    
+    # Interval - use a bracketed solver when the sign change is real
+    fa, fb = f(a), f(b)
+    evaluations = 2
+    if fa * fb < 0:
+        if open_method is not None:
+            root, iters, evals = solve_open(f, a, open_method, x1=b, xtol=xtol, fdf=fdf, fx0=fa, fx1=fb)
+            evaluations += evals
+            if root is not None and min(a, b) <= root <= max(a, b):
+                if tracer.per_iteration:
+                    print(f"{open_method} finished in {iters} iterations ({evaluations} evaluations)")
+                return root, iters, open_method, evaluations
+        root, iters, evals = solve_bracket(f, a, b, bracket_method, xtol=xtol, fa=fa, fb=fb)
+        evaluations += evals
+        if tracer.per_iteration:
+            print(f"{bracket_method} finished in {iters} iterations ({evaluations} evaluations)")
+        if tracer.recording and root is not None:
+            tracer.record('bracket', iters, root, math.nan, a, b)
+        return root, iters, bracket_method, evaluations
+    return (*bisection_newton_hybrid(f, df, a, b, tol_newton=xtol, fdf=fdf, tracer=tracer), None)
+
+# Per-worker state, set once by the pool initializer instead of being sent with each task
+_worker = {}
+
+def _init_worker(expr, bracket_method, xtol, open_method=None):
+    """Compiles the expression once in each worker process, with errors ignored like the rest of its output"""
+    f = compile_expression(expr, on_error=ignore_error)
+    _worker.update(f=f, df=lambda x: numerical_derivative(f, x), fdf=make_derivative(f),
+                   bracket_method=bracket_method, xtol=xtol, tracer=Tracer(SILENT), open_method=open_method)
+
+def _refine_in_worker(interval):
+    a, b = interval
+    w = _worker
+    return refine_interval(w['f'], w['df'], w['fdf'], a, b, w['bracket_method'], w['tracer'], w['xtol'],
+                           w['open_method'])
+
+def refine_intervals_parallel(f, intervals, bracket_method='brent', workers=4, executor='process', fdf=None,
+                              xtol=1e-15, open_method=None):
+    """
+    Refines the intervals on a pool of workers and returns the results in input order.
+    Process workers rebuild f from its expression string in the pool initializer, so
+    the function is shipped once per worker and each task only carries (a, b).
+    Thread workers share f directly. Workers run silently.
+    """
+    chunksize = max(1, len(intervals) // (4 * workers))
+    if executor == 'thread':
+        df = lambda x: numerical_derivative(f, x)
+        fdf = fdf or make_derivative(f)
+        tracer = Tracer(SILENT)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            refine = lambda ab: refine_interval(f, df, fdf, ab[0], ab[1], bracket_method, tracer, xtol, open_method)
+            return list(pool.map(refine, intervals))
+    if executor != 'process':
+        raise ValueError(f"Unknown executor '{executor}', use 'process' or 'thread'")
+    if not hasattr(f, 'expr'):
+        raise ValueError("Process workers need a function compiled from an expression string")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(f.expr, bracket_method, xtol, open_method)) as pool:
+        return list(pool.map(_refine_in_worker, intervals, chunksize=chunksize))
+
+def find_polynomial_roots(coeffs, search_range=None, tracer=None, tol=1e-10, include_complex=False):
+    """
+    Real roots of a polynomial from its coefficients as a RootSet, optionally
+    limited to search_range. With include_complex the complex roots whose
+    real part lies in search_range go to the complex_roots list.
+    """
+    tracer = tracer or DEFAULT_TRACER
+    if tracer.summary:
+        print(f"\nPolynomial of degree {len(coeffs) - 1} detected, solving from its coefficients...")
+    
+    roots = RootSet(tol)
+    for root, multiplicity, iters in polynomial_roots(coeffs, include_complex=include_complex):
+        if search_range is not None and not search_range[0] <= root.real <= search_range[1]:
+            continue
+        if isinstance(root, complex):
+            roots.complex_roots.append(Root(root, iters, 'polynomial', abs(horner(coeffs, root)[0]), None))
+            if tracer.summary:
+                print(f"Found complex root: {root:.10g}")
+            continue
+        roots.add(root, iters, 'polynomial', horner(coeffs, root)[0])
+        if tracer.summary:
+            suffix = f" (multiplicity {multiplicity})" if multiplicity > 1 else ""
+            print(f"Found distinct root: {root:.16e}{suffix}")
+    
+    return roots
+
+# Behaviour of find_all_roots from before these options existed
+LEGACY_DEFAULTS = {'bracket_method': 'hybrid', 'polynomial': False, 'fallback_points': 20}
+
+def find_all_roots(f, search_range=(-100, 100), step=0.5, tol=1e-10, **options):
+    """
+    Finds all roots of a function within a given range.
+    Returns (roots, iterations, methods) as aligned lists in ascending order of
+    the roots; find_root_set takes the same arguments and returns the RootSet
+    with each root's residual and bracket as well.
+    Options not given keep their LEGACY_DEFAULTS (bisection followed by
+    Newton-Raphson, no polynomial fast path, 20 fallback starting points),
+    so existing callers get the same roots and method labels; find_root_set
+    defaults to Brent, the polynomial path and 1000 array starts instead.
+    """
+    return find_root_set(f, search_range, step, tol, **{**LEGACY_DEFAULTS, **options}).as_lists()
+
+def find_root_set(f, search_range=(-100, 100), step=0.5, tol=1e-10, f_vec=None, bracket_method='brent',
+                  scan='uniform', max_evals=2000, tracer=None, fdf=None, polynomial=True,
+                  workers=None, executor='process', xtol=1e-15, fallback_points=1000, max_evaluations=None,
+                  metrics=None, deflation=False, open_method=None):
+    """
+    Finds all roots of a function within a given range and collects them in a RootSet.
+    bracket_method selects how sign-change intervals are refined: 'hybrid' for
+    bisection followed by Newton-Raphson, or one of the bracketed solvers
+    ('brent', 'illinois', 'itp', 'bisection').
+    scan='adaptive' replaces the fixed step grid by the locally refined scan,
+    limited to max_evals evaluations; scan='interval' prunes the range with
+    interval arithmetic (max_evals bounds the boxes) and needs f.expr;
+    scan='chebyshev' finds the roots directly as eigenvalues of piecewise
+    Chebyshev interpolants (see chebyshev.chebyshev_roots), including roots
+    without a sign change, and needs f.expr or f_vec. fdf optionally supplies
+    the function returning (f(x), f'(x)) instead of deriving it from f.
+    With polynomial=True, expressions that are polynomials are solved from
+    their coefficients instead (every real root, including double roots);
+    search_range may then be None to return all of them.
+    workers > 1 refines the intervals on a 'process' or 'thread' pool; roots,
+    their order and the deduplication are the same as in the serial run.
+    xtol is the convergence tolerance of the solvers, tol the distance below
+    which two roots count as the same.
+    When the scan finds nothing, Newton-Raphson is started from fallback_points
+    evenly spaced points, iterated together as arrays (20 scalar runs for
+    functions without an expression string).
+    max_evaluations caps the calls of f, f' and the vectorized functions made
+    in this process (array calls count each point); exceeding it raises
+    BudgetExceeded.
+    metrics (a metrics.Metrics) collects evaluation counts, the time of each
+    phase (polynomial, scan, fallback, refine, verify) and the iterations per
+    root; evaluations in process workers are not counted.
+    deflation=True runs Muller's method with implicit deflation against the
+    roots already found, started from the candidates of the scan that have
+    no sign change (critical points, small values) and from points spread
+    over the range; those candidates then skip the midpoint Newton runs,
+    so each even-multiplicity root is reported once. It adds real roots with method 'muller' and puts
+    complex roots in the complex_roots list of the RootSet. It needs f.expr;
+    for a polynomial the complex roots come from its coefficients instead.
+    open_method ('newton', 'secant', 'steffensen' or 'halley', see
+    open_solvers) refines each sign-change interval and start point with
+    that open solver, falling back to bracket_method when it leaves the
+    interval; each Root records the evaluations it cost.
+    scan='chebyshev' leaves nothing to refine or deflate, so it cannot be
+    combined with deflation or open_method (ValueError).
+    """
+    tracer = tracer or DEFAULT_TRACER
+    metrics = metrics or DISABLED
+    if scan == 'chebyshev' and (deflation or open_method is not None):
+        raise ValueError("scan='chebyshev' returns polished roots: it cannot be combined with "
+                         "deflation or open_method")
+    if deflation and not hasattr(f, 'expr'):
+        raise ValueError("deflation=True needs f.expr to evaluate f at complex points")
+    if metrics.enabled:
+        f = metrics.wrap(f, 'function_evaluations')
+        f_vec = metrics.wrap(f_vec, 'vectorized_points', vectorized=True) if f_vec is not None else None
+    budget = EvaluationBudget(max_evaluations) if max_evaluations is not None else None
+    if budget:
+        f = budget.wrap(f)
+        f_vec = budget.wrap(f_vec, vectorized=True) if f_vec is not None else None
+    
+    # Polynomials skip the scan: all roots come from the companion matrix
+    coeffs = polynomial_coefficients(f.expr) if polynomial and hasattr(f, 'expr') else None
+    if coeffs is not None:
+        with metrics.phase('polynomial'):
+            roots = find_polynomial_roots(coeffs, search_range, tracer, tol, include_complex=deflation)
+        for root in roots:
+            metrics.count('roots', method=root.method)
+            metrics.count('iterations', root.iterations, method=root.method)
+            metrics.observe('iterations_per_root', root.iterations)
+        return roots
+    if search_range is None:
+        raise ValueError("A search range is required for functions that are not polynomials")
+    
+    if bracket_method != 'hybrid' and bracket_method not in BRACKETED_SOLVERS:
+        raise ValueError(f"Unknown bracket method '{bracket_method}'")
+    if open_method is not None and open_method not in OPEN_SOLVERS:
+        raise ValueError(f"Unknown open method '{open_method}'")
+    
+    # Create derivative functions: exact f and f' in one pass, finite differences as fallback
+    df = lambda x: numerical_derivative(f, x)
+    if fdf is None:
+        fdf = make_derivative(f)
+    fdf = metrics.wrap(fdf, 'derivative_evaluations')
+    if budget:
+        fdf = budget.wrap(fdf)
+    
+    # Find intervals with sign changes or critical points
+    results = None
+    with metrics.phase('scan'):
+        if scan == 'chebyshev':
+            from chebyshev import chebyshev_roots  # loads NumPy, only needed by this scan
             
-            if is_distinct:
-                # Verify it's actually a root
-                fx = f(root)
-                if abs(fx) < 1e-8:  # Strict tolerance for considering it a root
-                    roots.append(root)
-                    iterations_per_root.append(iters)
-                    methods.append(method)
-                    print(f"Found distinct root: {root:.16e} (in {iters} iterations)")
-                else:
-                    print(f"Rejecting candidate at {root:.8f} because f(x) = {fx:.4e} (not a root)")
-            else:
-                print(f"Skipping duplicate root: {root:.16e}")
+            if not hasattr(f, 'expr') and f_vec is None:
+                raise ValueError("scan='chebyshev' needs f.expr or f_vec")
+            if f_vec is None:
+                f_vec = metrics.wrap(compile_vectorized(f.expr), 'vectorized_points', vectorized=True)
+                if budget:
+                    f_vec = budget.wrap(f_vec, vectorized=True)
+            found = chebyshev_roots(f_vec, search_range[0], search_range[1], fdf, xtol=xtol, tracer=tracer)
+            # The roots come out of the eigenvalues already polished: nothing is left to refine
+            intervals = [(x, x) for x, _ in found.roots]
+            results = [(x, iters, 'chebyshev', None) for x, iters in found.roots]
+        elif scan == 'interval':
+            if not hasattr(f, 'expr'):
+                raise ValueError("scan='interval' needs f.expr: interval arithmetic works on the expression")
+            intervals = find_sign_change_intervals_pruned(f.expr, search_range[0], search_range[1], max_evals, tracer)
+        elif scan == 'adaptive':
+            intervals = find_sign_change_intervals_adaptive(f, search_range[0], search_range[1], max_evals=max_evals,
+                                                            tracer=tracer)
+        elif f_vec is not None:
+            intervals = find_sign_change_intervals_vectorized(f_vec, search_range[0], search_range[1], step, tracer)
         else:
-            print(f"Failed to find root in interval [{a:.2f}, {b:.2f}]")
+            intervals = find_sign_change_intervals(f, search_range[0], search_range[1], step, tracer)
+    metrics.count('intervals', len(intervals))
     
-    return roots, iterations_per_root, methods
+    # An empty result of interval pruning or a Chebyshev proxy proves there is no root; other scans may miss some
+    if not intervals and scan not in ('interval', 'chebyshev'):
+        with metrics.phase('fallback'):
+            if hasattr(f, 'expr'):
+                if tracer.summary:
+                    print(f"No intervals found. Running Newton-Raphson from {fallback_points} sample points at once.")
+                # Dense multi-start: all starting points iterate together as arrays
+                width = (search_range[1] - search_range[0]) / (fallback_points - 1)
+                sample_points = [search_range[0] + k * width for k in range(fallback_points)]
+                fdf_vec = compile_with_derivative(f.expr, vectorized=True)
+                fdf_vec = metrics.wrap(fdf_vec, 'vectorized_points', vectorized=True)
+                if budget:
+                    fdf_vec = budget.wrap(fdf_vec, vectorized=True)
+                xs, iters, converged = newton_raphson_vectorized(fdf_vec, sample_points, xtol, tracer=tracer)
+                # Many lanes reach each root; keep the converged lane with the smallest residual per root
+                residuals = abs(fdf_vec(xs)[0])
+                best = {}
+                for i in sorted(converged.nonzero()[0].tolist(), key=lambda i: xs[i]):
+                    key = next((k for k in best if abs(xs[k] - xs[i]) <= 1e-6 * max(1.0, abs(xs[i]))), None)
+                    if key is None:
+                        best[i] = i
+                    elif residuals[i] < residuals[best[key]]:
+                        best[key] = i
+                chosen = sorted(best.values())
+                intervals = [(sample_points[i], sample_points[i]) for i in chosen]
+                results = [(float(xs[i]), int(iters[i]), 'newton', None) for i in chosen]
+            else:
+                if tracer.summary:
+                    print("No intervals found. Trying to find roots using Newton-Raphson at sample points.")
+                # Sample function at various points and try Newton-Raphson
+                width = (search_range[1] - search_range[0]) / 19
+                sample_points = [search_range[0] + k * width for k in range(20)]
+                intervals = [(x, x) for x in sample_points]
+    
+    # With deflation, candidates without a sign change start Muller instead of the midpoint Newton runs,
+    # which stop short of a double root at slightly different points each time
+    starts = []
+    if deflation and results is None:
+        bracketed = [(a, b) for a, b in intervals if a != b and f(a) * f(b) < 0]
+        starts = [0.5 * (a + b) for a, b in intervals if a == b or not f(a) * f(b) < 0]
+        intervals = bracketed
+    
+    roots = RootSet(tol)
+    
+    # Refine every interval unless the scan already returned finished results (Chebyshev, array fallback);
+    # the pool returns results in interval order
+    with metrics.phase('refine'):
+        if results is None and workers and workers > 1 and len(intervals) > 1:
+            if tracer.summary:
+                print(f"Refining {len(intervals)} intervals with {workers} {executor} workers...")
+            results = refine_intervals_parallel(f, intervals, bracket_method, workers, executor, fdf, xtol,
+                                                open_method)
+        elif results is None:
+            results = []
+            for i, (a, b) in enumerate(intervals):
+                if tracer.per_iteration:
+                    print(f"\nProcessing interval {i+1}: [{a:.2f}, {b:.2f}]")
+                results.append(refine_interval(f, df, fdf, a, b, bracket_method, tracer, xtol, open_method))
+    
+    # Merge in interval order so deduplication matches the serial run
+    with metrics.phase('verify'):
+        for (a, b), (root, iters, method, evaluations) in zip(intervals, results):
+            if root is not None:
+                # Check if this root is distinct from previous ones (bisect lookup in the sorted set)
+                existing = roots.find_near(root)
+                if existing is not None and tracer.per_iteration:
+                    print(f"Root at {root:.8f} is similar to existing root {existing.x:.8f}")
+                
+                if existing is None:
+                    # Verify it's actually a root
+                    fx = f(root)
+                    if abs(fx) < 1e-8:  # Strict tolerance for considering it a root
+                        roots.add(root, iters, method, fx, (a, b) if a != b else None, evaluations)
+                        metrics.count('roots', method=method)
+                        metrics.count('iterations', iters, method=method)
+                        metrics.observe('iterations_per_root', iters)
+                        if evaluations is not None:
+                            metrics.count('refine_evaluations', evaluations, method=method)
+                            metrics.observe('evaluations_per_root', evaluations)
+                        if tracer.summary:
+                            print(f"Found distinct root: {root:.16e} (in {iters} iterations)")
+                    elif tracer.per_iteration:
+                        print(f"Rejecting candidate at {root:.8f} because f(x) = {fx:.4e} (not a root)")
+                elif tracer.per_iteration:
+                    print(f"Skipping duplicate root: {root:.16e}")
+            elif tracer.summary:
+                print(f"Failed to find root in interval [{a:.2f}, {b:.2f}]")
+    
+    # Roots the scan cannot see: even multiplicity and complex, with the found ones deflated away
+    if deflation:
+        with metrics.phase('deflation'):
+            fc = compile_complex(f.expr)
+            # Each start may lead to a root of its own
+            found = find_roots_by_deflation(fc, roots.xs, search_range, xtol=max(xtol, 1e-14), starts=starts,
+                                            max_roots=max(50, 2 * len(starts)))
+            for z, iters, multiplicity in found:
+                if isinstance(z, complex):
+                    roots.complex_roots.append(Root(z, iters, 'muller', abs(fc(z)), None))
+                    if tracer.summary:
+                        print(f"Found complex root: {z:.10g}")
+                elif roots.add(z, iters, 'muller', f(z)) is not None:
+                    metrics.count('roots', method='muller')
+                    metrics.count('iterations', iters, method='muller')
+                    metrics.observe('iterations_per_root', iters)
+                    if tracer.summary:
+                        suffix = f" (multiplicity {multiplicity})" if multiplicity > 1 else ""
+                        print(f"Found distinct root: {z:.16e} (Muller, {iters} iterations){suffix}")
+    
+    return roots
 
 def main():
     """Main program execution"""
@@ -248,7 +843,11 @@ def main():
     print(f"Converted expression: {converted_str}")
     
     # Create executable function
-    f = string_to_function(converted_str)
+    try:
+        f = string_to_function(converted_str, cache_size=4096)
+    except ValueError as e:
+        print(f"Invalid expression: {e}")
+        return
     
     # Test function at x=0
     try:
@@ -258,8 +857,14 @@ def main():
         print("Function test failed. Please check your expression.")
         return
     
-    # Find all roots
-    roots, iterations, methods = find_all_roots(f)
+    # Array version of f for the grid scan
+    f_vec = string_to_function(converted_str, vectorized=True)
+    
+    # Polynomials need no search range: every real root is found at once
+    search_range = None if polynomial_coefficients(converted_str) is not None else (-100, 100)
+    
+    # Find all roots (kept sorted together with their metadata)
+    roots = find_root_set(f, search_range, f_vec=f_vec)
     
     # Display results
     print("\n" + "="*70)
@@ -267,25 +872,26 @@ def main():
     print("="*70)
     
     if roots:
-        # Sort roots
-        roots_sorted = sorted(roots)
-        
-        for i, (root, iters, method) in enumerate(zip(roots_sorted, iterations, methods)):
-            fx = f(root)
-            print(f"Root {i+1}: x = {root:.16e}")
+        for i, root in enumerate(roots):
+            fx = f(root.x)
+            print(f"Root {i+1}: x = {root.x:.16e}")
             print(f"         f(x) = {fx:.4e}")
-            print(f"         Iterations: {iters}")
-            print(f"         Method: {method}")
+            print(f"         Iterations: {root.iterations}")
+            print(f"         Method: {root.method}")
+            if root.bracket is not None:
+                print(f"         Interval: [{root.bracket[0]:.2f}, {root.bracket[1]:.2f}]")
             print("-" * 50)
         
         print(f"\nTotal distinct roots found: {len(roots)}")
         
         # Check root validity
-        valid_roots = [root for root in roots if abs(f(root)) < 1e-10]
+        valid_roots = [root for root in roots if abs(f(root.x)) < 1e-10]
         print(f"Valid roots (|f(x)| < 1e-10): {len(valid_roots)}")
     else:
         print("No roots found in the specified range.")
     
+    info = f.cache_info()
+    print(f"Function evaluations: {info.misses} (cache hits: {info.hits})")
     print("="*70)
 
 if __name__ == "__main__":
@@ -1,28 +1,25 @@
 import sys
 import math
-import re
+
+from expression_compiler import compile_expression, convert_power_notation, parse_expression
+from tracing import DEFAULT_TRACER
 
 def converter_potencia(expressao_str):
     """Converte notações de potência para sintaxe Python"""
-    # Unicode exponents
-    substituicoes_unicode = {
-        '²': '**2', '³': '**3', '⁴': '**4', '⁵': '**5', 
-        '⁶': '**6', '⁷': '**7', '⁸': '**8', '⁹': '**9', '⁰': '**0'
-    }
-    for char, repl in substituicoes_unicode.items():
-        expressao_str = expressao_str.replace(char, repl)
-    
-    # Circumflex notation
-    expressao_str = re.sub(r'(\d*\.?\d+|\b\w+|[\)])\s*\^\s*(\d*\.?\d+|\b\w+|[\()])', r'\1**\2', expressao_str)
-    
-    # Implicit multiplication
-    expressao_str = re.sub(r'(\d)([a-zA-Z\(])', r'\1*\2', expressao_str)
-    expressao_str = re.sub(r'([a-zA-Z\)])(\d)', r'\1*\2', expressao_str)
-    
-    return expressao_str
+    # Mesmos padrões pré-compilados das outras interfaces
+    return convert_power_notation(expressao_str)
 
-def string_para_funcao(expressao: str):
+def erro_avaliacao(x, e):
+    print(f"Erro ao avaliar função em x={x}: {e}")
+
+def string_para_funcao(expressao: str, compilada=True):
     """Converte string para função executável"""
+    # Modo compilado: analisa e valida a expressão uma única vez
+    if compilada:
+        return compile_expression(expressao, on_error=erro_avaliacao)
+    
+    # Valida uma vez: o eval abaixo só vê sintaxe da lista permitida e constantes limitadas
+    parse_expression(expressao)
     ambiente = {
         'sin': math.sin, 'cos': math.cos, 'tan': math.tan,
         'asin': math.asin, 'acos': math.acos, 'atan': math.atan,
@@ -39,14 +36,16 @@ def string_para_funcao(expressao: str):
         try:
             return eval(expressao, {'__builtins__': None}, ambiente_local)
         except Exception as e:
-            print(f"Erro ao avaliar função em x={x}: {e}")
+            erro_avaliacao(x, e)
             return float('nan')
     
     return f
 
-def encontrar_intervalos(f, inicio=-10, fim=10, passo=0.5):
+def encontrar_intervalos(f, inicio=-10, fim=10, passo=0.5, traco=None):
     """Encontra todos os intervalos com troca de sinal dentro de um range"""
-    print("Procurando intervalos com troca de sinal...")
+    traco = traco or DEFAULT_TRACER
+    if traco.summary:
+        print("Procurando intervalos com troca de sinal...")
     intervalos = []
     x_atual = inicio
     f_anterior = f(x_atual)
@@ -65,37 +64,21 @@ def encontrar_intervalos(f, inicio=-10, fim=10, passo=0.5):
         if f_anterior * f_atual < 0:
             intervalo = (x_atual, x_proximo)
             intervalos.append(intervalo)
-            print(f"Troca de sinal encontrada entre {x_atual:.2f} e {x_proximo:.2f}")
+            if traco.per_iteration:
+                print(f"Troca de sinal encontrada entre {x_atual:.2f} e {x_proximo:.2f}")
         
         x_atual = x_proximo
         f_anterior = f_atual
     
     return intervalos
 
-# Solicitar a função do usuário
-funcao_str = input("\nDigite a função f(x) (use 'x' como variável, ex: x**2 - 2): ")
-
-# Converter notações de potência
-funcao_str_convertida = converter_potencia(funcao_str)
-print(f"Expressão convertida: {funcao_str_convertida}")
-
-# Criar função matemática
-funcao = string_para_funcao(funcao_str_convertida)
-
-# Encontrar todos os intervalos com troca de sinal
-intervalos = encontrar_intervalos(funcao)
-
-if not intervalos:
-    print("Nenhum intervalo com troca de sinal encontrado. Insira manualmente.")
-    a = float(input("Digite o valor inicial do intervalo (a): "))
-    b = float(input("Digite o valor final do intervalo (b): "))
-    intervalos = [(a, b)]
-
 # Derivada numérica
-def derivada(x, h=1e-5):
+def derivada(funcao, x, h=1e-5):
     return (funcao(x + h) - funcao(x - h)) / (2 * h)
 
-def bissecao_newton_raphson(a, b):
+def bissecao_newton_raphson(funcao, a, b, traco=None):
+    traco = traco or DEFAULT_TRACER
+    
     # Configurações
     TOL_BISSEC = 1e-8
     TOL_NEWTON = 1e-15
@@ -108,13 +91,15 @@ def bissecao_newton_raphson(a, b):
     
     # Verificar troca de sinal
     if math.isnan(fa) or math.isnan(fb):
-        print("Valor inválido na função. Verifique o intervalo.")
+        if traco.summary:
+            print("Valor inválido na função. Verifique o intervalo.")
         return None
         
     if fa * fb >= 0:
-        print("ERRO: f(a) e f(b) devem ter sinais opostos!")
-        print(f"f({a}) = {fa}")
-        print(f"f({b}) = {fb}")
+        if traco.summary:
+            print("ERRO: f(a) e f(b) devem ter sinais opostos!")
+            print(f"f({a}) = {fa}")
+            print(f"f({b}) = {fb}")
         return None
 
     iteracao = 0
@@ -125,13 +110,18 @@ def bissecao_newton_raphson(a, b):
         fc = funcao(c)
         
         if math.isnan(fc):
-            print("Valor inválido encontrado na função.")
+            if traco.summary:
+                print("Valor inválido encontrado na função.")
             return None
             
-        print(f"Iteração {iteracao + 1}: a = {a:.6f}, b = {b:.6f}, c = {c:.6f}, f(c) = {fc:.6e}")
+        if traco.per_iteration:
+            print(f"Iteração {iteracao + 1}: a = {a:.6f}, b = {b:.6f}, c = {c:.6f}, f(c) = {fc:.6e}")
+        if traco.recording:
+            traco.record('bisection', iteracao + 1, c, fc, a, b)
 
         if abs(fc) < TOL_BISSEC:
-            print(f"Convergência na bisseção após {iteracao+1} iterações")
+            if traco.summary:
+                print(f"Convergência na bisseção após {iteracao+1} iterações")
             return c
 
         if fa * fc < 0:
@@ -142,80 +132,116 @@ def bissecao_newton_raphson(a, b):
             fa = fc
 
         if abs(b - a) < TOL_BISSEC:
-            print(f"Intervalo suficientemente pequeno após {iteracao+1} iterações")
+            if traco.summary:
+                print(f"Intervalo suficientemente pequeno após {iteracao+1} iterações")
             break
 
         iteracao += 1
 
     # Fase de Newton-Raphson
     x = (a + b) / 2
-    print(f"\nIniciando Newton-Raphson com x0 = {x:.6f}")
+    if traco.summary:
+        print(f"\nIniciando Newton-Raphson com x0 = {x:.6f}")
     newton_iter = 0
     
     while newton_iter < MAX_ITER_TOTAL - iteracao:
         fx = funcao(x)
-        dfx = derivada(x)
+        dfx = derivada(funcao, x)
         
         if abs(dfx) < 1e-15:
-            print("Derivada próxima de zero. Usando resultado atual.")
+            if traco.summary:
+                print("Derivada próxima de zero. Usando resultado atual.")
             return x
 
         x_new = x - fx / dfx
         fx_new = funcao(x_new)
         newton_iter += 1
         
-        print(f"Iteração {iteracao + newton_iter}: x = {x_new:.16e}, f(x) = {fx_new:.16e}")
+        if traco.per_iteration:
+            print(f"Iteração {iteracao + newton_iter}: x = {x_new:.16e}, f(x) = {fx_new:.16e}")
+        if traco.recording:
+            traco.record('newton', iteracao + newton_iter, x_new, fx_new)
 
         if abs(fx_new) < TOL_NEWTON or abs(x_new - x) < TOL_NEWTON:
-            print("Convergência alcançada.")
+            if traco.summary:
+                print("Convergência alcançada.")
             x = x_new
             break
 
         x = x_new
 
-    print(f"\nTotal de iterações: {iteracao + newton_iter}")
+    if traco.summary:
+        print(f"\nTotal de iterações: {iteracao + newton_iter}")
     return x
 
-# Encontrar e exibir todas as raízes
-raizes = []
-tolerancia_raiz = 1e-5
-
-for a, b in intervalos:
-    print(f"\nCalculando raiz no intervalo [{a}, {b}]")
-    raiz = bissecao_newton_raphson(a, b)
+def main():
+    """Execução principal do programa"""
+    # Solicitar a função do usuário
+    funcao_str = input("\nDigite a função f(x) (use 'x' como variável, ex: x**2 - 2): ")
+
+    # Converter notações de potência
+    funcao_str_convertida = converter_potencia(funcao_str)
+    print(f"Expressão convertida: {funcao_str_convertida}")
+
+    # Criar função matemática
+    try:
+        funcao = string_para_funcao(funcao_str_convertida)
+    except ValueError as e:
+        print(f"Expressão inválida: {e}")
+        sys.exit(1)
+
+    # Encontrar todos os intervalos com troca de sinal
+    intervalos = encontrar_intervalos(funcao)
+
+    if not intervalos:
+        print("Nenhum intervalo com troca de sinal encontrado. Insira manualmente.")
+        a = float(input("Digite o valor inicial do intervalo (a): "))
+        b = float(input("Digite o valor final do intervalo (b): "))
+        intervalos = [(a, b)]
+
+    # Encontrar e exibir todas as raízes
+    raizes = []
+    tolerancia_raiz = 1e-5
+
+    for a, b in intervalos:
+        print(f"\nCalculando raiz no intervalo [{a}, {b}]")
+        raiz = bissecao_newton_raphson(funcao, a, b)
     
-    if raiz is not None:
-        # Verificar se a raiz já foi encontrada
-        if not any(abs(raiz - r) < tolerancia_raiz for r in raizes):
-            raizes.append(raiz)
-            print(f"Raiz encontrada: {raiz:.16e}")
+        if raiz is not None:
+            # Verificar se a raiz já foi encontrada
+            if not any(abs(raiz - r) < tolerancia_raiz for r in raizes):
+                raizes.append(raiz)
+                print(f"Raiz encontrada: {raiz:.16e}")
+            else:
+                print(f"Raiz duplicada ignorada: {raiz:.16e}")
         else:
-            print(f"Raiz duplicada ignorada: {raiz:.16e}")
-    else:
-        print("Não foi possível encontrar uma raiz neste intervalo.")
-
-# Exibir resumo completo de todas as raízes encontradas
-print("\n" + "="*60)
-print("RESUMO DAS RAÍZES ENCONTRADAS")
-print("="*60)
-
-if raizes:
-    raizes_ordenadas = sorted(raizes)
-    for i, raiz in enumerate(raizes_ordenadas, 1):
-        valor_funcao = funcao(raiz)
-        print(f"Raiz {i}: x = {raiz:.16e}")
-        print(f"         f(x) = {valor_funcao:.4e}")
-        print(f"         Intervalo inicial: [{next((a for a, b in intervalos if min(a, b) <= raiz <= max(a, b)), 'N/A'):.2f}, " +
-              f"{next((b for a, b in intervalos if min(a, b) <= raiz <= max(a, b)), 'N/A'):.2f}]")
-        print("-" * 40)
+            print("Não foi possível encontrar uma raiz neste intervalo.")
+
+    # Exibir resumo completo de todas as raízes encontradas
+    print("\n" + "="*60)
+    print("RESUMO DAS RAÍZES ENCONTRADAS")
+    print("="*60)
+
+    if raizes:
+        raizes_ordenadas = sorted(raizes)
+        for i, raiz in enumerate(raizes_ordenadas, 1):
+            valor_funcao = funcao(raiz)
+            print(f"Raiz {i}: x = {raiz:.16e}")
+            print(f"         f(x) = {valor_funcao:.4e}")
+            print(f"         Intervalo inicial: [{next((a for a, b in intervalos if min(a, b) <= raiz <= max(a, b)), 'N/A'):.2f}, " +
+                  f"{next((b for a, b in intervalos if min(a, b) <= raiz <= max(a, b)), 'N/A'):.2f}]")
+            print("-" * 40)
     
-    print(f"\nTotal de raízes distintas encontradas: {len(raizes)}")
+        print(f"\nTotal de raízes distintas encontradas: {len(raizes)}")
     
-    # Verificar se todas as raízes são válidas (f(x) próximo de zero)
-    raizes_validas = [raiz for raiz in raizes if abs(funcao(raiz)) < 1e-10]
-    print(f"Raízes válidas (|f(x)| < 1e-10): {len(raizes_validas)}")
+        # Verificar se todas as raízes são válidas (f(x) próximo de zero)
+        raizes_validas = [raiz for raiz in raizes if abs(funcao(raiz)) < 1e-10]
+        print(f"Raízes válidas (|f(x)| < 1e-10): {len(raizes_validas)}")
     
-else:
-    print("Nenhuma raiz encontrada nos intervalos fornecidos.")
+    else:
+        print("Nenhuma raiz encontrada nos intervalos fornecidos.")
+
+    print("="*60)
 
-print("="*60)
+if __name__ == "__main__":
+    main()
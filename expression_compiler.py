@@ -0,0 +1,481 @@
+import ast
+import cmath
+import math
+import re
+from collections import OrderedDict, namedtuple
+
+# Functions and constants available inside user expressions
+MATH_FUNCTIONS = {
+    'sin': math.sin, 'cos': math.cos, 'tan': math.tan,
+    'asin': math.asin, 'acos': math.acos, 'atan': math.atan,
+    'sinh': math.sinh, 'cosh': math.cosh, 'tanh': math.tanh,
+    'asinh': math.asinh, 'acosh': math.acosh, 'atanh': math.atanh,
+    'log': math.log, 'log10': math.log10, 'log2': math.log2,
+    'exp': math.exp, 'sqrt': math.sqrt, 'abs': abs, 'fabs': math.fabs,
+    'degrees': math.degrees, 'radians': math.radians
+}
+
+MATH_CONSTANTS = {'pi': math.pi, 'e': math.e, 'tau': math.tau}
+
+# The same functions over the complex plane, for expressions evaluated at complex points
+COMPLEX_FUNCTIONS = {
+    'sin': cmath.sin, 'cos': cmath.cos, 'tan': cmath.tan,
+    'asin': cmath.asin, 'acos': cmath.acos, 'atan': cmath.atan,
+    'sinh': cmath.sinh, 'cosh': cmath.cosh, 'tanh': cmath.tanh,
+    'asinh': cmath.asinh, 'acosh': cmath.acosh, 'atanh': cmath.atanh,
+    'log': cmath.log, 'log10': cmath.log10, 'log2': lambda z: cmath.log(z) / math.log(2),
+    'exp': cmath.exp, 'sqrt': cmath.sqrt, 'abs': abs, 'fabs': abs,
+    'degrees': lambda z: z * (180 / math.pi), 'radians': lambda z: z * (math.pi / 180)
+}
+
+# Largest literal exponent accepted; 10**10**10 would otherwise hang the evaluation
+MAX_LITERAL_EXPONENT = 1024
+
+# Largest constant power accepted, in decimal digits: (10**1000)**1000 is a million-digit integer
+MAX_LITERAL_DIGITS = 10000
+
+# Unicode superscript exponents and the power/multiplication patterns, compiled once
+UNICODE_EXPONENTS = {
+    '²': '**2', '³': '**3', '⁴': '**4', '⁵': '**5',
+    '⁶': '**6', '⁷': '**7', '⁸': '**8', '⁹': '**9', '⁰': '**0'
+}
+_CIRCUMFLEX = re.compile(r'(\d*\.?\d+|\b\w+|[\)])\s*\^\s*(\d*\.?\d+|\b\w+|[\()])')
+_DIGIT_BEFORE_NAME = re.compile(r'(\d)([a-zA-Z\(])')
+_NAME_BEFORE_DIGIT = re.compile(r'([a-zA-Z\)])(\d)')
+
+# AST node types an expression may contain
+ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod, ast.FloorDiv,
+    ast.UAdd, ast.USub
+)
+
+
+def convert_power_notation(expr_str):
+    """Converts all power notations to Python syntax (base**exponent)"""
+    # Unicode exponents
+    for char, repl in UNICODE_EXPONENTS.items():
+        expr_str = expr_str.replace(char, repl)
+
+    # Circumflex notation
+    expr_str = _CIRCUMFLEX.sub(r'\1**\2', expr_str)
+
+    # Implicit multiplication
+    expr_str = _DIGIT_BEFORE_NAME.sub(r'\1*\2', expr_str)
+    expr_str = _NAME_BEFORE_DIGIT.sub(r'\1*\2', expr_str)
+
+    return expr_str
+
+
+def _literal_log10(node):
+    """
+    Estimate of log10 |value| of a subtree made only of number literals, or
+    None. Exact for products, quotients and powers, an upper bound for sums;
+    huge values come out as inf without being computed.
+    """
+    if isinstance(node, ast.Constant):
+        return math.log10(abs(node.value)) if node.value else 0.0
+    if isinstance(node, ast.UnaryOp):
+        return _literal_log10(node.operand)
+    if isinstance(node, ast.BinOp):
+        left, right = _literal_log10(node.left), _literal_log10(node.right)
+        if left is None or right is None:
+            return None
+        if isinstance(node.op, ast.Mult):
+            return left + right
+        if isinstance(node.op, ast.Div):
+            return left - right
+        if isinstance(node.op, ast.Pow):
+            # |exponent| * |log10 base|, bounding large and tiny results alike
+            return math.inf if right > 300 else 10 ** right * abs(left)
+        return max(left, right) + math.log10(2)
+    return None
+
+
+def parse_expression(expr: str, variables=('x',)):
+    """
+    Parses an expression string and validates it against the whitelist.
+    Powers whose exponent is made of literals larger than MAX_LITERAL_EXPONENT
+    in magnitude are rejected, since evaluating them can take unbounded time,
+    and so are constant powers of more than MAX_LITERAL_DIGITS digits.
+    """
+    try:
+        tree = ast.parse(expr.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression '{expr}': {e.msg}") from None
+
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax in expression: {type(node).__name__}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ValueError(f"Unsupported constant in expression: {node.value!r}")
+        if isinstance(node, ast.Name) and node.id not in variables \
+                and node.id not in MATH_FUNCTIONS and node.id not in MATH_CONSTANTS:
+            raise ValueError(f"Unknown name in expression: {node.id}")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in MATH_FUNCTIONS:
+                raise ValueError("Only calls to the supported math functions are allowed")
+            if node.keywords:
+                raise ValueError("Keyword arguments are not allowed in expressions")
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow):
+            exponent = _literal_log10(node.right)
+            if exponent is not None and exponent > math.log10(MAX_LITERAL_EXPONENT):
+                raise ValueError(f"Exponent too large in expression (limit {MAX_LITERAL_EXPONENT})")
+            digits = _literal_log10(node)
+            if digits is not None and digits > MAX_LITERAL_DIGITS:
+                raise ValueError(f"Constant too large in expression (limit {MAX_LITERAL_DIGITS} digits)")
+
+    return tree
+
+
+# Operators applied when folding constant subexpressions
+_FOLD_OPERATORS = {
+    ast.Add: lambda a, b: a + b, ast.Sub: lambda a, b: a - b, ast.Mult: lambda a, b: a * b,
+    ast.Div: lambda a, b: a / b, ast.Pow: lambda a, b: a ** b, ast.Mod: lambda a, b: a % b,
+    ast.FloorDiv: lambda a, b: a // b, ast.UAdd: lambda a: +a, ast.USub: lambda a: -a
+}
+
+# Integer powers rewritten as repeated multiplication
+STRENGTH_REDUCED_POWERS = (2, 3)
+
+
+def _constant(value):
+    """AST for a folded number; negatives stay a unary minus so unparse keeps x**(-2) intact"""
+    if value < 0:
+        return ast.UnaryOp(ast.USub(), ast.Constant(-value))
+    return ast.Constant(value)
+
+
+def _constant_value(node):
+    """The value of a literal or negated literal node, or None"""
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub) and isinstance(node.operand, ast.Constant):
+        return -node.operand.value
+    return None
+
+
+class _ConstantFolder(ast.NodeTransformer):
+    """Replaces constant subexpressions (2*pi/3, sqrt(2), ...) by their value"""
+
+    def __init__(self, variables):
+        self.variables = variables
+
+    def _fold(self, node, compute, *operands):
+        values = [_constant_value(operand) for operand in operands]
+        if any(v is None for v in values):
+            return node
+        # Huge integer powers would take forever to fold; leave them to run time
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow) \
+                and all(isinstance(v, int) for v in values) \
+                and (abs(values[1]) > MAX_LITERAL_EXPONENT
+                     or abs(values[1]) * abs(_literal_log10(node.left)) > MAX_LITERAL_DIGITS):
+            return node
+        try:
+            value = compute(*values)
+        except (ArithmeticError, ValueError, TypeError):
+            return node  # errors (math domain, wrong number of arguments) keep their run-time behaviour
+        if isinstance(value, float) and not math.isfinite(value) or not isinstance(value, (int, float)):
+            return node
+        return _constant(value)
+
+    def visit_Name(self, node):
+        if node.id in MATH_CONSTANTS and node.id not in self.variables:
+            return ast.Constant(MATH_CONSTANTS[node.id])
+        return node
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        return self._fold(node, _FOLD_OPERATORS[type(node.op)], node.left, node.right)
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.USub) and isinstance(node.operand, ast.Constant):
+            return node
+        return self._fold(node, _FOLD_OPERATORS[type(node.op)], node.operand)
+
+    def visit_Call(self, node):
+        node.args = [self.visit(arg) for arg in node.args]
+        return self._fold(node, MATH_FUNCTIONS[node.func.id], *node.args)
+
+
+def optimize_expression(tree, variables=('x',)):
+    """
+    Optimizes a parsed expression for code generation.
+    Constants are folded, x**2 and x**3 become products, and subexpressions
+    that occur more than once are computed a single time into temporaries.
+    Returns (assignments, body): source lines binding the temporaries in
+    evaluation order and the source of the final expression.
+    """
+    tree = _ConstantFolder(variables).visit(tree)
+
+    # Count occurrences top-down; a repeated subtree is not descended into again
+    counts = {}
+
+    def count(node):
+        if isinstance(node, (ast.Name, ast.Constant)) or _constant_value(node) is not None:
+            return
+        key = ast.dump(node)
+        counts[key] = counts.get(key, 0) + 1
+        if counts[key] == 1:
+            for child in ast.iter_child_nodes(node):
+                count(child)
+
+    count(tree.body)
+
+    assignments = []
+    temporaries = {}
+
+    def bind(node):
+        name = f"_t{len(assignments)}"
+        assignments.append(f"{name} = {ast.unparse(node)}")
+        return ast.Name(name, ast.Load())
+
+    def emit(node):
+        if isinstance(node, (ast.Name, ast.Constant)) or _constant_value(node) is not None:
+            return node
+        key = ast.dump(node)
+        if key in temporaries:
+            return temporaries[key]
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow) \
+                and type(_constant_value(node.right)) is int and _constant_value(node.right) in STRENGTH_REDUCED_POWERS:
+            base = emit(node.left)
+            if not isinstance(base, ast.Name):
+                base = bind(base)
+            result = base
+            for _ in range(node.right.value - 1):
+                result = ast.BinOp(result, ast.Mult(), base)
+        elif isinstance(node, ast.BinOp):
+            result = ast.BinOp(emit(node.left), node.op, emit(node.right))
+        elif isinstance(node, ast.UnaryOp):
+            result = ast.UnaryOp(node.op, emit(node.operand))
+        else:
+            result = ast.Call(node.func, [emit(arg) for arg in node.args], [])
+        if counts.get(key, 0) > 1:
+            result = bind(result)
+        temporaries[key] = result
+        return result
+
+    return assignments, ast.unparse(emit(tree.body))
+
+
+def _report_error(x, e):
+    """Default error reporter, matches the message of the eval-based functions"""
+    print(f"Error evaluating function at x={x}: {e}")
+
+
+def ignore_error(x, e):
+    """
+    Silent error reporter for callers that expect evaluation errors (scans
+    crossing domain edges, steps leaving the domain, batch workers): the
+    function just returns NaN and the caller handles it.
+    """
+
+
+def _may_be_complex(tree):
+    """True if a power with a non-integer exponent can turn real arguments complex ((-8)**(1/3))"""
+    return any(isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow)
+               and not isinstance(_constant_value(node.right), int) for node in ast.walk(tree))
+
+
+def _generate(tree, variables, optimize):
+    """(assignments, body) of the code for a parsed expression"""
+    if optimize:
+        return optimize_expression(tree, variables)
+    return [], ast.unparse(tree.body)
+
+
+def compile_expression(expr: str, on_error=_report_error, variables=('x',), optimize=True,
+                       functions=MATH_FUNCTIONS):
+    """
+    Compiles an expression once into a specialized Python function of x.
+    The expression is parsed and validated a single time and the math functions
+    are bound as globals of the generated function, so each call costs one
+    bytecode run instead of a parse plus a dictionary merge.
+    On evaluation errors on_error(x, exception) is called and NaN is returned.
+    With several variables the function takes them as positional arguments
+    in that order and on_error receives them as a tuple.
+    With optimize the code is generated by optimize_expression.
+    functions=COMPLEX_FUNCTIONS gives a function that accepts complex x;
+    otherwise a complex result counts as an evaluation error.
+    """
+    tree = parse_expression(expr, variables)
+    real = functions is MATH_FUNCTIONS and _may_be_complex(tree)
+    assignments, body = _generate(tree, variables, optimize)
+    if real:
+        body = f"_float({body})"
+    args = ', '.join(variables)
+
+    source = (
+        f"def f({args}):\n"
+        "    try:\n"
+        + ''.join(f"        {line}\n" for line in assignments)
+        + f"        return {body}\n"
+        "    except Exception as exc:\n"
+        f"        _on_error(({args}), exc)\n"
+        "        return _nan\n"
+    )
+
+    namespace = {'__builtins__': {}, 'Exception': Exception,
+                 '_on_error': on_error, '_nan': float('nan'), '_float': float}
+    namespace.update(functions)
+    namespace.update(MATH_CONSTANTS)
+    exec(compile(source, '<expression>', 'exec'), namespace)
+
+    f = namespace['f']
+    f.expr = expr
+    f.on_error = on_error
+    return f
+
+
+# NumPy ufuncs replacing the math functions in vectorized expressions
+VECTORIZED_FUNCTION_NAMES = {
+    'sin': 'sin', 'cos': 'cos', 'tan': 'tan',
+    'asin': 'arcsin', 'acos': 'arccos', 'atan': 'arctan',
+    'sinh': 'sinh', 'cosh': 'cosh', 'tanh': 'tanh',
+    'asinh': 'arcsinh', 'acosh': 'arccosh', 'atanh': 'arctanh',
+    'log': 'log', 'log10': 'log10', 'log2': 'log2',
+    'exp': 'exp', 'sqrt': 'sqrt', 'abs': 'abs', 'fabs': 'fabs',
+    'degrees': 'degrees', 'radians': 'radians'
+}
+
+
+def _real_part(y):
+    """y with NaN where its value is complex, for arrays that must stay real"""
+    import numpy as np
+
+    if not np.iscomplexobj(y):
+        return y
+    return np.where(y.imag == 0, y.real, np.nan)
+
+
+def vectorized_namespace():
+    """Returns the NumPy functions and helpers used by generated array code"""
+    import numpy as np  # only needed by the vectorized backend
+
+    namespace = {name: getattr(np, ufunc) for name, ufunc in VECTORIZED_FUNCTION_NAMES.items()}
+    # np.log takes an output array as second argument, math.log takes a base
+    namespace['log'] = lambda a, base=None: np.log(a) if base is None else np.log(a) / np.log(base)
+    namespace.update({'_asarray': np.asarray, '_float': float, '_errstate': np.errstate,
+                      '_zeros_like': np.zeros_like, '_isfinite': np.isfinite,
+                      '_where': np.where, '_nan': np.nan, '_floor': np.floor, '_sign': np.sign,
+                      '_real': _real_part})
+    return namespace
+
+
+def compile_vectorized(expr: str, variables=('x',), optimize=True):
+    """
+    Compiles an expression into an array-aware function of x.
+    The math functions are replaced by NumPy ufuncs so a whole grid is
+    evaluated in one call. Points where the scalar function would raise
+    (log of a negative, division by zero, overflow, a complex power) come
+    back as NaN. With several variables each argument is an array of the
+    same shape.
+    """
+    tree = parse_expression(expr, variables)
+    assignments, body = _generate(tree, variables, optimize)
+    if _may_be_complex(tree):
+        body = f"_real({body})"
+
+    source = (
+        f"def f_vec({', '.join(variables)}):\n"
+        + ''.join(f"    {v} = _asarray({v}, dtype=_float)\n" for v in variables)
+        + "    with _errstate(all='ignore'):\n"
+        + ''.join(f"        {line}\n" for line in assignments)
+        + f"        y = ({body}) + _zeros_like({variables[0]})\n"
+        "    return _where(_isfinite(y), y, _nan)\n"
+    )
+
+    namespace = {'__builtins__': {}}
+    namespace.update(vectorized_namespace())
+    namespace.update(MATH_CONSTANTS)
+    exec(compile(source, '<expression>', 'exec'), namespace)
+
+    f_vec = namespace['f_vec']
+    f_vec.expr = expr
+    return f_vec
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class CachedFunction:
+    """
+    Memoizing wrapper around f with a bounded LRU keyed on the exact input.
+    Sharing one instance between the scan, the solvers and the verification
+    steps means repeated points (bracket endpoints, roots checked again)
+    are evaluated only once.
+    """
+
+    def __init__(self, f, maxsize=4096):
+        self.f = f
+        self.maxsize = maxsize
+        # The expression and error handler let derived functions (fdf, workers) be compiled alike
+        for name in ('expr', 'on_error'):
+            if hasattr(f, name):
+                setattr(self, name, getattr(f, name))
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def __call__(self, x):
+        cache = self._cache
+        try:
+            value = cache[x]
+        except KeyError:
+            self.misses += 1
+            value = cache[x] = self.f(x)
+            if len(cache) > self.maxsize:
+                cache.popitem(last=False)
+            return value
+        self.hits += 1
+        cache.move_to_end(x)
+        return value
+
+    def cache_info(self):
+        """Returns hit/miss statistics in the style of functools.lru_cache"""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._cache))
+
+    def cache_clear(self):
+        """Empties the cache and resets the statistics"""
+        self._cache.clear()
+        self.hits = self.misses = 0
+
+
+class BudgetExceeded(Exception):
+    """Raised when a solve uses up its evaluation budget"""
+
+
+class EvaluationBudget:
+    """
+    Shared count of function evaluations with an upper limit.
+    wrap() returns f counting each call against the budget (each element of
+    the argument for vectorized functions); once more than max_evaluations
+    have been made, the next call raises BudgetExceeded.
+    """
+
+    def __init__(self, max_evaluations):
+        self.max_evaluations = max_evaluations
+        self.used = 0
+
+    def charge(self, n=1):
+        self.used += n
+        if self.used > self.max_evaluations:
+            raise BudgetExceeded(f"more than {self.max_evaluations} function evaluations")
+
+    def wrap(self, f, vectorized=False):
+        charge = self.charge
+
+        if vectorized:
+            def counted(x, *args):
+                charge(len(x) if hasattr(x, '__len__') else 1)
+                return f(x, *args)
+        else:
+            def counted(*args):
+                charge()
+                return f(*args)
+
+        for name in ('expr', 'on_error'):
+            if hasattr(f, name):
+                setattr(counted, name, getattr(f, name))
+        return counted
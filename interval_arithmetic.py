@@ -0,0 +1,400 @@
+import ast
+import math
+from collections import namedtuple
+
+from expression_compiler import ignore_error, parse_expression, MATH_CONSTANTS
+
+INF = math.inf
+
+
+def _down(x):
+    """Rounds a lower bound outward by one ulp to absorb rounding errors"""
+    return math.nextafter(x, -INF) if math.isfinite(x) else x
+
+
+def _up(x):
+    return math.nextafter(x, INF) if math.isfinite(x) else x
+
+
+def _mul_bound(a, b):
+    """Product of two bounds with 0 * inf = 0, as interval multiplication requires"""
+    if a == 0 or b == 0:
+        return 0.0
+    return a * b
+
+
+class Interval:
+    """
+    Closed interval [lo, hi] of reals with outward-rounded arithmetic, so the
+    result of any operation encloses every value the exact operation can take.
+    An empty interval (lo > hi) stands for points where the expression is
+    undefined; it propagates through every operation.
+    """
+
+    __slots__ = ('lo', 'hi')
+
+    def __init__(self, lo, hi=None):
+        self.lo = float(lo)
+        self.hi = float(lo if hi is None else hi)
+
+    @classmethod
+    def rounded(cls, lo, hi):
+        if lo > hi or math.isnan(lo) or math.isnan(hi):
+            return EMPTY
+        return cls(_down(lo), _up(hi))
+
+    @property
+    def is_empty(self):
+        return self.lo > self.hi
+
+    @property
+    def width(self):
+        return self.hi - self.lo
+
+    def __contains__(self, value):
+        return self.lo <= value <= self.hi
+
+    def __repr__(self):
+        return "Interval(empty)" if self.is_empty else f"Interval({self.lo!r}, {self.hi!r})"
+
+    def __eq__(self, other):
+        other = _coerce(other)
+        return (self.is_empty and other.is_empty) or (self.lo == other.lo and self.hi == other.hi)
+
+    __hash__ = None
+
+    def __pos__(self):
+        return self
+
+    def __neg__(self):
+        return self if self.is_empty else Interval(-self.hi, -self.lo)
+
+    def __add__(self, other):
+        other = _coerce(other)
+        if self.is_empty or other.is_empty:
+            return EMPTY
+        return Interval.rounded(self.lo + other.lo, self.hi + other.hi)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = _coerce(other)
+        if self.is_empty or other.is_empty:
+            return EMPTY
+        return Interval.rounded(self.lo - other.hi, self.hi - other.lo)
+
+    def __rsub__(self, other):
+        return _coerce(other) - self
+
+    def __mul__(self, other):
+        other = _coerce(other)
+        if self.is_empty or other.is_empty:
+            return EMPTY
+        products = [_mul_bound(a, b) for a in (self.lo, self.hi) for b in (other.lo, other.hi)]
+        return Interval.rounded(min(products), max(products))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = _coerce(other)
+        if self.is_empty or other.is_empty or (other.lo == 0 and other.hi == 0):
+            return EMPTY
+        if other.lo <= 0 <= other.hi:
+            return WHOLE
+        return self * Interval.rounded(1 / other.hi, 1 / other.lo)
+
+    def __rtruediv__(self, other):
+        return _coerce(other) / self
+
+    def __pow__(self, other):
+        other = _coerce(other)
+        if self.is_empty or other.is_empty:
+            return EMPTY
+        if other.lo == other.hi and other.lo == int(other.lo):
+            return _integer_power(self, int(other.lo))
+        # Real exponent: defined for a positive base only, x**y = exp(y*log(x))
+        return exp(other * log(self))
+
+    def __rpow__(self, other):
+        return _coerce(other) ** self
+
+    def __mod__(self, other):
+        other = _coerce(other)
+        if self.is_empty or other.is_empty:
+            return EMPTY
+        if other.lo > 0:
+            # Stays within [0, b) whatever the dividend
+            return Interval(0.0, other.hi)
+        return WHOLE
+
+    def __rmod__(self, other):
+        return _coerce(other) % self
+
+    def __floordiv__(self, other):
+        return _floor(self / other)
+
+    def __rfloordiv__(self, other):
+        return _coerce(other) // self
+
+
+EMPTY = Interval(INF, -INF)
+WHOLE = Interval(-INF, INF)
+
+
+def _coerce(value):
+    return value if isinstance(value, Interval) else Interval(value)
+
+
+def _integer_power(x, n):
+    if n == 0:
+        return Interval(1.0)
+    if n < 0:
+        return 1 / _integer_power(x, -n)
+    lo, hi = x.lo ** n, x.hi ** n
+    if n % 2 == 1:
+        return Interval.rounded(lo, hi)
+    if x.lo >= 0:
+        return Interval.rounded(lo, hi)
+    if x.hi <= 0:
+        return Interval.rounded(hi, lo)
+    return Interval(0.0, _up(max(lo, hi)))
+
+
+def _monotone(function, lower=-INF, upper=INF, increasing=True):
+    """Interval extension of a monotone function defined on [lower, upper]"""
+    def extension(x):
+        x = _coerce(x)
+        lo, hi = max(x.lo, lower), min(x.hi, upper)
+        if lo > hi:
+            return EMPTY
+        a, b = _apply(function, lo), _apply(function, hi)
+        return Interval.rounded(a, b) if increasing else Interval.rounded(b, a)
+    return extension
+
+
+def _apply(function, value):
+    """Evaluates a bound, mapping overflow and infinite limits to infinities"""
+    try:
+        return function(value)
+    except OverflowError:
+        return INF if value > 0 else -INF
+    except ValueError:
+        # Limits at the edge of the domain, e.g. log(0) or atanh(1)
+        return -INF if value <= 0 else INF
+
+
+def log(x, base=None):
+    result = _log(x)
+    return result if base is None else result / _log(base)
+
+
+_log = _monotone(math.log, 0.0)
+exp = _monotone(math.exp)
+sqrt = _monotone(math.sqrt, 0.0)
+log10 = _monotone(math.log10, 0.0)
+log2 = _monotone(math.log2, 0.0)
+atan = _monotone(math.atan)
+asin = _monotone(math.asin, -1.0, 1.0)
+acos = _monotone(math.acos, -1.0, 1.0, increasing=False)
+sinh = _monotone(math.sinh)
+tanh = _monotone(math.tanh)
+asinh = _monotone(math.asinh)
+acosh = _monotone(math.acosh, 1.0)
+atanh = _monotone(math.atanh, -1.0, 1.0)
+degrees = _monotone(math.degrees)
+radians = _monotone(math.radians)
+_floor = _monotone(lambda v: float(math.floor(v)) if math.isfinite(v) else v)
+
+
+def _contains_point(x, offset, period):
+    """True when x contains offset + k*period for some integer k"""
+    return math.floor((x.hi - offset) / period) >= math.ceil((x.lo - offset) / period)
+
+
+def sin(x):
+    x = _coerce(x)
+    if x.is_empty:
+        return EMPTY
+    if x.width >= 2 * math.pi:
+        return Interval(-1.0, 1.0)
+    a, b = math.sin(x.lo), math.sin(x.hi)
+    lo, hi = min(a, b), max(a, b)
+    if _contains_point(x, math.pi / 2, 2 * math.pi):
+        hi = 1.0
+    if _contains_point(x, -math.pi / 2, 2 * math.pi):
+        lo = -1.0
+    return Interval(max(-1.0, _down(lo)), min(1.0, _up(hi)))
+
+
+def cos(x):
+    x = _coerce(x)
+    if x.is_empty:
+        return EMPTY
+    if x.width >= 2 * math.pi:
+        return Interval(-1.0, 1.0)
+    a, b = math.cos(x.lo), math.cos(x.hi)
+    lo, hi = min(a, b), max(a, b)
+    if _contains_point(x, 0.0, 2 * math.pi):
+        hi = 1.0
+    if _contains_point(x, math.pi, 2 * math.pi):
+        lo = -1.0
+    return Interval(max(-1.0, _down(lo)), min(1.0, _up(hi)))
+
+
+def tan(x):
+    x = _coerce(x)
+    if x.is_empty:
+        return EMPTY
+    if x.width >= math.pi or _contains_point(x, math.pi / 2, math.pi):
+        return WHOLE
+    return Interval.rounded(math.tan(x.lo), math.tan(x.hi))
+
+
+def cosh(x):
+    x = _coerce(x)
+    if x.is_empty:
+        return EMPTY
+    a, b = _apply(math.cosh, x.lo), _apply(math.cosh, x.hi)
+    lo = 1.0 if x.lo <= 0 <= x.hi else min(a, b)
+    return Interval.rounded(lo, max(a, b))
+
+
+def fabs(x):
+    x = _coerce(x)
+    if x.is_empty:
+        return EMPTY
+    if x.lo >= 0:
+        return x
+    if x.hi <= 0:
+        return -x
+    return Interval(0.0, max(-x.lo, x.hi))
+
+
+def _sign(x):
+    x = _coerce(x)
+    if x.is_empty:
+        return EMPTY
+    if x.lo > 0:
+        return Interval(1.0)
+    if x.hi < 0:
+        return Interval(-1.0)
+    return Interval(-1.0, 1.0)
+
+
+# Interval versions of the functions allowed in expressions
+INTERVAL_FUNCTIONS = {
+    'sin': sin, 'cos': cos, 'tan': tan,
+    'asin': asin, 'acos': acos, 'atan': atan,
+    'sinh': sinh, 'cosh': cosh, 'tanh': tanh,
+    'asinh': asinh, 'acosh': acosh, 'atanh': atanh,
+    'log': log, 'log10': log10, 'log2': log2,
+    'exp': exp, 'sqrt': sqrt, 'abs': fabs, 'fabs': fabs,
+    'degrees': degrees, 'radians': radians
+}
+
+
+def interval_namespace():
+    """Globals that make generated expression code evaluate on Intervals"""
+    namespace = {'__builtins__': {}, 'Exception': Exception, '_on_error': ignore_error,
+                 '_nan': WHOLE, '_ln10': math.log(10), '_ln2': math.log(2),
+                 '_deg': 180 / math.pi, '_rad': math.pi / 180, '_floor': _floor, '_sign': _sign}
+    namespace.update(INTERVAL_FUNCTIONS)
+    namespace.update(MATH_CONSTANTS)
+    return namespace
+
+
+def compile_interval(expr: str, derivative=False):
+    """
+    Compiles an expression into F(X) returning an Interval that encloses f
+    over the Interval X. With derivative=True the function returns
+    (F(X), F'(X)) using the forward-mode code of autodiff evaluated on
+    Intervals. Any error inside the evaluation yields the whole real line,
+    which never prunes anything.
+    """
+    if derivative:
+        from autodiff import _derivative_source
+        source = _derivative_source(expr, vectorized=False)
+        name = 'fdf'
+    else:
+        body = ast.unparse(parse_expression(expr).body)
+        source = (
+            "def F(x):\n"
+            "    try:\n"
+            f"        return {body} + _zero\n"
+            "    except Exception:\n"
+            "        return _nan\n"
+        )
+        name = 'F'
+
+    namespace = interval_namespace()
+    namespace['_zero'] = Interval(0.0)
+    exec(compile(source, '<expression>', 'exec'), namespace)
+
+    function = namespace[name]
+    function.expr = expr
+    return function
+
+
+# Outcome of branch and prune: candidate intervals, whether each holds exactly one
+# certified root, interval evaluations spent, and whether the whole range was resolved
+PruneResult = namedtuple('PruneResult', ['intervals', 'certified', 'boxes', 'complete'])
+
+
+def branch_and_prune(F, a, b, min_width=1e-6, max_boxes=20000, fdf=None):
+    """
+    Splits [a, b] recursively and discards every subinterval whose enclosure
+    F(X) excludes zero: f provably has no root there. What remains is the
+    list of candidate intervals, so a root can only be missed if it is not
+    in any of them. When fdf (from compile_interval(expr, derivative=True))
+    is given, boxes where the derivative enclosure excludes zero are
+    monotone: they hold a single root if the endpoint signs differ and are
+    discarded otherwise, without further splitting, unless an endpoint
+    enclosure is not finite: those boxes are split further.
+    Boxes narrower than min_width are kept as candidates. If max_boxes is
+    reached the unexplored boxes are returned too and complete is False.
+    """
+    stack = [(a, b)]
+    found = []
+    boxes = 0
+    while stack:
+        lo, hi = stack.pop()
+        if boxes >= max_boxes:
+            found.append((lo, hi, False))
+            continue
+        boxes += 1
+        Y = F(Interval(lo, hi))
+        if Y.is_empty or 0 not in Y:
+            continue
+
+        if fdf is not None:
+            _, dY = fdf(Interval(lo, hi))
+            if not dY.is_empty and 0 not in dY:
+                # Monotone: decide with the signs at the endpoints
+                ya, yb = F(Interval(lo)), F(Interval(hi))
+                boxes += 2
+                # An endpoint that overflowed (exp(1e6)) cannot be evaluated by the solvers: keep splitting
+                if ya.is_empty or yb.is_empty or not all(map(math.isfinite, (ya.lo, ya.hi, yb.lo, yb.hi))):
+                    pass
+                elif (ya.hi < 0 < yb.lo) or (yb.hi < 0 < ya.lo):
+                    found.append((lo, hi, True))
+                    continue
+                elif (ya.lo > 0 and yb.lo > 0) or (ya.hi < 0 and yb.hi < 0):
+                    continue
+
+        if hi - lo <= min_width * max(1.0, abs(0.5 * (lo + hi))):
+            found.append((lo, hi, False))
+            continue
+        mid = 0.5 * (lo + hi)
+        # Push the right half first so intervals come out in ascending order
+        stack.append((mid, hi))
+        stack.append((lo, mid))
+
+    # Merge touching uncertified boxes (clusters around one root or a double root)
+    intervals, certified = [], []
+    for lo, hi, unique in sorted(found):
+        if intervals and not unique and not certified[-1] and intervals[-1][1] >= lo:
+            intervals[-1] = (intervals[-1][0], hi)
+        else:
+            intervals.append((lo, hi))
+            certified.append(unique)
+    return PruneResult(intervals, certified, boxes, boxes < max_boxes)
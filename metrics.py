@@ -0,0 +1,144 @@
+import cProfile
+import io
+import json
+import pstats
+import time
+from contextlib import contextmanager, nullcontext
+
+# Upper bounds of the iterations-per-root histogram buckets (Prometheus 'le' labels)
+ITERATION_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class Metrics:
+    """
+    Counters, per-phase timers and histograms collected during solves.
+    Passed as metrics= to find_root_set (and batch.solve_one); one instance
+    may accumulate over many solves. Counters are keyed by name plus an
+    optional method label; phase() times a block of code; observe() adds a
+    value to a histogram. A disabled instance (DISABLED) turns every method
+    into a no-op, and find_root_set only wraps f when metrics are enabled,
+    so uninstrumented solves pay nothing.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.counters = {}
+        self.timers = {}
+        self.histograms = {}
+
+    def count(self, name, n=1, method=None):
+        key = (name, method)
+        self.counters[key] = self.counters.get(key, 0) + n
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            total, calls = self.timers.get(name, (0.0, 0))
+            self.timers[name] = (total + time.perf_counter() - start, calls + 1)
+
+    def observe(self, name, value, buckets=ITERATION_BUCKETS):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = {'buckets': dict.fromkeys(buckets, 0), 'sum': 0, 'count': 0}
+        for bound in histogram['buckets']:
+            if value <= bound:
+                histogram['buckets'][bound] += 1
+        histogram['sum'] += value
+        histogram['count'] += 1
+
+    def wrap(self, f, name, vectorized=False):
+        """f counting its calls (points for vectorized functions) in counter name"""
+        counters = self.counters
+        key = (name, None)
+
+        if vectorized:
+            def counted(x, *args):
+                counters[key] = counters.get(key, 0) + (len(x) if hasattr(x, '__len__') else 1)
+                return f(x, *args)
+        else:
+            def counted(*args):
+                counters[key] = counters.get(key, 0) + 1
+                return f(*args)
+
+        for name in ('expr', 'on_error'):
+            if hasattr(f, name):
+                setattr(counted, name, getattr(f, name))
+        return counted
+
+    def reset(self):
+        self.counters.clear()
+        self.timers.clear()
+        self.histograms.clear()
+
+    def as_dict(self):
+        """Plain data: counters by 'name' or 'name{method}', timers as seconds and calls"""
+        return {
+            'counters': {name if method is None else f"{name}{{{method}}}": value
+                         for (name, method), value in sorted(self.counters.items(), key=str)},
+            'timers': {name: {'seconds': total, 'calls': calls} for name, (total, calls) in self.timers.items()},
+            'histograms': {name: {'buckets': {str(bound): n for bound, n in h['buckets'].items()},
+                                  'sum': h['sum'], 'count': h['count']}
+                           for name, h in self.histograms.items()},
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def to_prometheus(self, prefix='rootfinder'):
+        """Metrics in the Prometheus text exposition format"""
+        lines = []
+        for name in sorted({name for name, _ in self.counters}):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            for (counter, method), value in sorted(self.counters.items(), key=str):
+                if counter == name:
+                    label = '' if method is None else f'{{method="{method}"}}'
+                    lines.append(f"{prefix}_{name}_total{label} {value}")
+        if self.timers:
+            lines.append(f"# TYPE {prefix}_phase_seconds summary")
+            for name, (total, calls) in sorted(self.timers.items()):
+                lines.append(f'{prefix}_phase_seconds_sum{{phase="{name}"}} {total!r}')
+                lines.append(f'{prefix}_phase_seconds_count{{phase="{name}"}} {calls}')
+        for name, h in sorted(self.histograms.items()):
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for bound, n in h['buckets'].items():
+                lines.append(f'{prefix}_{name}_bucket{{le="{bound}"}} {n}')
+            lines.append(f'{prefix}_{name}_bucket{{le="+Inf"}} {h["count"]}')
+            lines.append(f"{prefix}_{name}_sum {h['sum']}")
+            lines.append(f"{prefix}_{name}_count {h['count']}")
+        return '\n'.join(lines) + '\n'
+
+
+class _DisabledMetrics(Metrics):
+    enabled = False
+
+    def count(self, name, n=1, method=None):
+        pass
+
+    def phase(self, name):
+        return nullcontext()
+
+    def observe(self, name, value, buckets=ITERATION_BUCKETS):
+        pass
+
+    def wrap(self, f, name, vectorized=False):
+        return f
+
+
+DISABLED = _DisabledMetrics()
+
+
+def profile_call(func, *args, sort='cumulative', limit=25, **kwargs):
+    """
+    Runs func(*args, **kwargs) under cProfile, e.g. a single find_root_set call.
+    Returns (result, report) where report is the pstats listing of the top
+    limit entries sorted by sort.
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args, **kwargs)
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats(sort).print_stats(limit)
+    return result, stream.getvalue()
@@ -0,0 +1,173 @@
+import cmath
+import math
+
+from expression_compiler import COMPLEX_FUNCTIONS, compile_expression, ignore_error
+
+# Largest multiplicity credited to one root; stops deflation from chasing rounding noise
+MAX_MULTIPLICITY = 8
+
+
+def compile_complex(expr):
+    """Compiles an expression into a function of a complex x (NaN on evaluation errors)"""
+    return compile_expression(expr, on_error=ignore_error, functions=COMPLEX_FUNCTIONS)
+
+
+def _finite(z):
+    return math.isfinite(z.real) and math.isfinite(z.imag)
+
+
+def muller(g, x0, x1, x2, xtol=1e-12, max_iter=100):
+    """
+    Muller's method: each step fits a parabola through the last three points
+    and moves to its root closest to the newest one. The square root may be
+    complex, so real starting points can converge to complex roots.
+    Returns (root, iterations, converged).
+    """
+    try:
+        f0, f1, f2 = g(x0), g(x1), g(x2)
+    except (ArithmeticError, ValueError):
+        return x2, 0, False
+    h1, h2 = x1 - x0, x2 - x1
+    for i in range(max_iter):
+        if not (_finite(complex(f0)) and _finite(complex(f1)) and _finite(complex(f2))):
+            return x2, i, False
+        if f2 == 0:
+            return x2, i, True
+        try:
+            d1, d2 = (f1 - f0) / h1, (f2 - f1) / h2
+            a = (d2 - d1) / (h2 + h1)
+            b = a * h2 + d2
+            root = cmath.sqrt(b * b - 4 * a * f2)
+            denominator = b + root if abs(b + root) >= abs(b - root) else b - root
+            dx = -2 * f2 / denominator
+        except ZeroDivisionError:
+            return x2, i, False
+        x3 = x2 + dx
+        if abs(dx) <= xtol * max(1.0, abs(x3)):
+            return x3, i + 1, True
+        try:
+            f3 = g(x3)
+        except (ArithmeticError, ValueError):
+            return x3, i + 1, False
+        x0, x1, x2 = x1, x2, x3
+        f0, f1, f2 = f1, f2, f3
+        h1, h2 = h2, dx
+    return x2, max_iter, False
+
+
+def _residual_ok(f, z, residual_tol, ratio=1e-3):
+    """
+    True if |f(z)| is below residual_tol and also small against |f| a short
+    step away. A real zero makes f grow away from it; where f merely
+    underflows (exp(x) far left) the neighbours are just as small.
+    """
+    value = complex(f(z))
+    if not _finite(value) or abs(value) > residual_tol:
+        return False
+    if value == 0:
+        return True
+    step = 1e-3 * max(1.0, abs(z))
+    nearby = max(abs(complex(f(z + step))), abs(complex(f(z - step))))
+    return abs(value) <= ratio * nearby
+
+
+def _multiplicity(f, z):
+    """Order of the zero at z from how fast |f| grows away from it: |f(z + 2h)| / |f(z + h)| = 2**m"""
+    step = 1e-3 * max(1.0, abs(z))
+    near, far = abs(complex(f(z + step))), abs(complex(f(z + 2 * step)))
+    if not (near > 0 and math.isfinite(far)):
+        return 1
+    return min(max(round(math.log2(far / near)), 1), MAX_MULTIPLICITY)
+
+
+def _polish(f, z, xtol, max_iter):
+    """Muller on the undeflated f from points around z; (z, 0) if it moves away or fails"""
+    h = 1e-6 * max(1.0, abs(z))
+    polished, steps, ok = muller(f, z - h, z + h, z, xtol, max_iter)
+    if ok and abs(polished - z) < 1e-3 * max(1.0, abs(z)):
+        return polished, steps
+    return z, 0
+
+
+def deflated(f, roots):
+    """g(z) = f(z) / prod((z - r)**m) over the (root, multiplicity) pairs, without touching f"""
+    def g(z):
+        value = f(z)
+        for r, m in roots:
+            value /= (z - r) ** m
+        return value
+    return g
+
+
+def find_roots_by_deflation(fc, known=(), search_range=(-100, 100), seeds=8, xtol=1e-12, max_iter=100,
+                            max_roots=50, imag_tol=1e-8, residual_tol=1e-8, starts=(), max_failures=3):
+    """
+    Finds roots of fc (a function of complex x) that the known roots do not
+    account for, using Muller's method with implicit deflation: instead of
+    dividing the expression, every iteration runs on f(z) / prod (z - r)**m
+    over the roots found so far, which removes them without rescanning.
+    Muller restarts from the given starts (e.g. the critical points of a
+    scan, where roots without a sign change hide) and from seeds points
+    spread over the search range. Each candidate is polished on the
+    undeflated f and accepted when |f| is below residual_tol and far below
+    |f| a short step away (so points where f underflows do not count),
+    whether or not Muller met xtol (it cannot at a multiple root). A start that fails is
+    retried with wider initial points, and given up after max_failures
+    failures in a row; finding a known root again counts as a failure.
+    The multiplicity of each root is estimated from how fast |f| grows away
+    from it, so even-multiplicity roots such as the 0 of x**2 are deflated
+    completely. Only the roots within one seed spacing of the start are
+    divided out, which keeps the deflated function well scaled when many
+    roots have been found. Complex roots of real functions come
+    with their conjugates, each polished on its own. Only roots with the real part in search_range and
+    an imaginary part at most half its width are returned.
+    Returns the new roots as (z, iterations, multiplicity) sorted by real part;
+    z is a float for real roots (|imag| <= imag_tol * max(1, |z|)).
+    """
+    a, b = search_range
+
+    def inside(z):
+        return a <= z.real <= b and abs(z.imag) <= (b - a) / 2
+
+    found = [[complex(r), _multiplicity(fc, complex(r))] for r in known]
+    new = {}
+    width = (b - a) / seeds
+    # Half-widths of the initial Muller points: local first, wider after each failure
+    spreads = [(b - a) * 1e-3 * 10 ** k for k in range(max_failures - 1)] + [width / 4]
+    tol = 1e-6
+
+    def accept(z, iterations):
+        if any(abs(r - z) <= tol * max(1.0, abs(z)) for r, _ in found):
+            return False
+        entry = [z, _multiplicity(fc, z)]
+        found.append(entry)
+        new[id(entry)] = [entry, iterations]
+        return True
+
+    for seed in [*starts, *(a + (k + 0.5) * width for k in range(seeds))]:
+        failures = 0
+        while len(new) < max_roots and failures < max_failures:
+            spread = spreads[min(failures, len(spreads) - 1)]
+            g = deflated(fc, [(r, m) for r, m in found if abs(r - seed) <= width])
+            z, iterations, _ = muller(g, seed - spread, seed + spread, seed, xtol, max_iter)
+            # Deflation loses accuracy as roots accumulate: polish on f itself
+            z, steps = _polish(fc, z, xtol, max_iter)
+            iterations += steps
+            if abs(z.imag) <= imag_tol * max(1.0, abs(z)):
+                z = complex(z.real, 0.0)
+            if not _residual_ok(fc, z, residual_tol) or not accept(z, iterations) or not inside(z):
+                failures += 1
+                continue
+            failures = 0
+            if z.imag != 0:
+                conjugate, steps = _polish(fc, z.conjugate(), xtol, max_iter)
+                if _residual_ok(fc, conjugate, residual_tol):
+                    accept(conjugate, steps)
+
+    results = []
+    for entry, iterations in new.values():
+        z, multiplicity = entry
+        if inside(z):
+            results.append((z.real + 0.0 if z.imag == 0 else z, iterations, multiplicity))
+    results.sort(key=lambda item: (complex(item[0]).real, complex(item[0]).imag))
+    return results
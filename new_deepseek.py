@@ -1,28 +1,21 @@
 import sys
 import math
-import re
 
-def convert_power_notation(expr_str):
-    """Converts all power notations to Python syntax (base**exponent)"""
-    # Unicode exponents
-    unicode_subs = {
-        '²': '**2', '³': '**3', '⁴': '**4', '⁵': '**5', 
-        '⁶': '**6', '⁷': '**7', '⁸': '**8', '⁹': '**9', '⁰': '**0'
-    }
-    for char, repl in unicode_subs.items():
-        expr_str = expr_str.replace(char, repl)
-    
-    # Circumflex notation
-    expr_str = re.sub(r'(\d*\.?\d+|\b\w+|[\)])\s*\^\s*(\d*\.?\d+|\b\w+|[\()])', r'\1**\2', expr_str)
-    
-    # Implicit multiplication
-    expr_str = re.sub(r'(\d)([a-zA-Z\(])', r'\1*\2', expr_str)
-    expr_str = re.sub(r'([a-zA-Z\)])(\d)', r'\1*\2', expr_str)
-    
-    return expr_str
+from expression_compiler import compile_expression, compile_vectorized, convert_power_notation, parse_expression
+from deepseek_conjunto import make_derivative, newton_raphson_fdf
+from tracing import DEFAULT_TRACER
 
-def string_to_function(expr: str):
+def string_to_function(expr: str, compiled=True, vectorized=False):
     """Converts a math expression string to an executable Python function"""
+    # Vectorized mode evaluates NumPy arrays in one call (domain errors become NaN)
+    if vectorized:
+        return compile_vectorized(expr)
+    # Compiled mode parses and validates once; the eval mode re-parses on every call
+    if compiled:
+        return compile_expression(expr)
+    
+    # Validate once so the eval below only ever sees whitelisted, bounded syntax
+    parse_expression(expr)
     env = {
         'sin': math.sin, 'cos': math.cos, 'tan': math.tan,
         'asin': math.asin, 'acos': math.acos, 'atan': math.atan,
@@ -44,9 +37,11 @@ def string_to_function(expr: str):
     
     return f
 
-def find_sign_change_interval(f, min_val=-100, max_val=100, step=1.0):
+def find_sign_change_interval(f, min_val=-100, max_val=100, step=1.0, tracer=None):
     """Automatically finds an interval where the function changes sign"""
-    print("\nSearching for sign change interval...")
+    tracer = tracer or DEFAULT_TRACER
+    if tracer.summary:
+        print("\nSearching for sign change interval...")
     
     # Create evaluation points from min_val to max_val
     x_vals = [min_val + i*step for i in range(int((max_val - min_val)/step) + 1)]
@@ -56,7 +51,8 @@ def find_sign_change_interval(f, min_val=-100, max_val=100, step=1.0):
         try:
             fx = f(x)
             if not math.isnan(fx):
-                print(f"f({x:7.2f}) = {fx:12.6e}")
+                if tracer.per_iteration:
+                    print(f"f({x:7.2f}) = {fx:12.6e}")
                 valid_points.append((x, fx))
         except:
             continue
@@ -67,25 +63,64 @@ def find_sign_change_interval(f, min_val=-100, max_val=100, step=1.0):
         x2, f2 = valid_points[i+1]
         
         if f1 * f2 < 0:
-            print(f"\nSign change found between {x1:.2f} and {x2:.2f}")
-            print(f"f({x1:.2f}) = {f1:.6e}")
-            print(f"f({x2:.2f}) = {f2:.6e}")
+            if tracer.summary:
+                print(f"\nSign change found between {x1:.2f} and {x2:.2f}")
+                print(f"f({x1:.2f}) = {f1:.6e}")
+                print(f"f({x2:.2f}) = {f2:.6e}")
             return min(x1, x2), max(x1, x2)
         elif f1 == 0:
-            print(f"\nExact root found at x = {x1:.6f}")
+            if tracer.summary:
+                print(f"\nExact root found at x = {x1:.6f}")
             return x1, x1
         elif f2 == 0:
-            print(f"\nExact root found at x = {x2:.6f}")
+            if tracer.summary:
+                print(f"\nExact root found at x = {x2:.6f}")
             return x2, x2
     
     return None
 
+def find_sign_change_interval_vectorized(f_vec, min_val=-100, max_val=100, step=1.0, tracer=None):
+    """Array version of find_sign_change_interval: evaluates all points in one call"""
+    import numpy as np
+    
+    tracer = tracer or DEFAULT_TRACER
+    if tracer.summary:
+        print("\nSearching for sign change interval...")
+    
+    # Evaluate the whole grid and drop points where f is undefined
+    x_vals = min_val + step * np.arange(int((max_val - min_val)/step) + 1)
+    f_vals = f_vec(x_vals)
+    defined = ~np.isnan(f_vals)
+    x_vals, f_vals = x_vals[defined], f_vals[defined]
+    
+    # First pair of consecutive points with a sign change or an exact zero
+    f1, f2 = f_vals[:-1], f_vals[1:]
+    hits = np.flatnonzero((f1 * f2 < 0) | (f1 == 0) | (f2 == 0))
+    if hits.size == 0:
+        return None
+    
+    i = hits[0]
+    x1, x2 = float(x_vals[i]), float(x_vals[i + 1])
+    if f1[i] * f2[i] < 0:
+        if tracer.summary:
+            print(f"\nSign change found between {x1:.2f} and {x2:.2f}")
+            print(f"f({x1:.2f}) = {f1[i]:.6e}")
+            print(f"f({x2:.2f}) = {f2[i]:.6e}")
+        return min(x1, x2), max(x1, x2)
+    
+    root = x1 if f1[i] == 0 else x2
+    if tracer.summary:
+        print(f"\nExact root found at x = {root:.6f}")
+    return root, root
+
 def numerical_derivative(f, x, h=1e-5):
     """Calculates numerical derivative using central differences"""
     return (f(x + h) - f(x - h)) / (2 * h)
 
-def bisection_newton_hybrid(f, df, a, b, tol_bisection=1e-8, tol_newton=1e-15, max_iter=100):
+def bisection_newton_hybrid(f, df, a, b, tol_bisection=1e-8, tol_newton=1e-15, max_iter=100, fdf=None,
+                            tracer=None):
     """Hybrid root-finding algorithm combining bisection and Newton-Raphson"""
+    tracer = tracer or DEFAULT_TRACER
     # Initial function evaluations
     fa, fb = f(a), f(b)
     
@@ -97,10 +132,11 @@ def bisection_newton_hybrid(f, df, a, b, tol_bisection=1e-8, tol_newton=1e-15, m
     
     # Verify sign change
     if fa * fb >= 0:
-        print("No sign change in initial interval. Using Newton-Raphson directly.")
+        if tracer.summary:
+            print("No sign change in initial interval. Using Newton-Raphson directly.")
         # Start from midpoint
         x0 = (a + b) / 2
-        return newton_raphson(f, df, x0, tol_newton, max_iter)
+        return newton_raphson(f, df, x0, tol_newton, max_iter, fdf=fdf, tracer=tracer)
     
     iteration = 0
     
@@ -110,14 +146,19 @@ def bisection_newton_hybrid(f, df, a, b, tol_bisection=1e-8, tol_newton=1e-15, m
         fc = f(c)
         
         if math.isnan(fc):
-            print("NaN encountered during bisection. Aborting.")
+            if tracer.summary:
+                print("NaN encountered during bisection. Aborting.")
             return None
             
-        print(f"Bisection iter {iteration+1}: a={a:.6f}, b={b:.6f}, c={c:.6f}, f(c)={fc:.6e}")
+        if tracer.per_iteration:
+            print(f"Bisection iter {iteration+1}: a={a:.6f}, b={b:.6f}, c={c:.6f}, f(c)={fc:.6e}")
+        if tracer.recording:
+            tracer.record('bisection', iteration+1, c, fc, a, b)
         
         # Check for convergence
         if abs(fc) < tol_bisection:
-            print(f"Bisection converged after {iteration+1} iterations")
+            if tracer.summary:
+                print(f"Bisection converged after {iteration+1} iterations")
             return c
             
         # Update interval
@@ -128,18 +169,27 @@ def bisection_newton_hybrid(f, df, a, b, tol_bisection=1e-8, tol_newton=1e-15, m
             
         # Check interval size
         if abs(b - a) < tol_bisection:
-            print(f"Small interval after {iteration+1} bisection iterations")
+            if tracer.summary:
+                print(f"Small interval after {iteration+1} bisection iterations")
             break
             
         iteration += 1
     
     # Newton-Raphson phase starting from bisection result
     x0 = (a + b) / 2
-    print(f"\nStarting Newton-Raphson from x0 = {x0:.6f}")
-    return newton_raphson(f, df, x0, tol_newton, max_iter - iteration)
+    if tracer.summary:
+        print(f"\nStarting Newton-Raphson from x0 = {x0:.6f}")
+    return newton_raphson(f, df, x0, tol_newton, max_iter - iteration, fdf=fdf, tracer=tracer)
 
-def newton_raphson(f, df, x0, tol=1e-15, max_iter=50):
+def newton_raphson(f, df, x0, tol=1e-15, max_iter=50, fdf=None, tracer=None):
     """Newton-Raphson method for root finding"""
+    tracer = tracer or DEFAULT_TRACER
+    if fdf is None and df is None:
+        fdf = make_derivative(f)
+    if fdf is not None:
+        # The shared version also returns the iteration count; this module's API returns the root only
+        return newton_raphson_fdf(fdf, x0, tol, max_iter, tracer=tracer)[0]
+    
     x = x0
     for i in range(max_iter):
         fx = f(x)
@@ -147,23 +197,29 @@ def newton_raphson(f, df, x0, tol=1e-15, max_iter=50):
         
         # Check derivative
         if abs(dfx) < 1e-15:
-            print(f"Small derivative ({dfx:.2e}) at iter {i+1}. Using current estimate.")
+            if tracer.summary:
+                print(f"Small derivative ({dfx:.2e}) at iter {i+1}. Using current estimate.")
             return x
             
         # Newton step
         x_new = x - fx / dfx
         fx_new = f(x_new)
         
-        print(f"Newton iter {i+1}: x={x_new:.16e}, f(x)={fx_new:.16e}")
+        if tracer.per_iteration:
+            print(f"Newton iter {i+1}: x={x_new:.16e}, f(x)={fx_new:.16e}")
+        if tracer.recording:
+            tracer.record('newton', i+1, x_new, fx_new)
         
         # Check convergence
         if abs(fx_new) < tol or abs(x_new - x) < tol:
-            print(f"Newton converged after {i+1} iterations")
+            if tracer.summary:
+                print(f"Newton converged after {i+1} iterations")
             return x_new
             
         x = x_new
     
-    print(f"Newton-Raphson reached max iterations ({max_iter})")
+    if tracer.summary:
+        print(f"Newton-Raphson reached max iterations ({max_iter})")
     return x
 
 def main():
@@ -176,7 +232,11 @@ def main():
     print(f"Converted expression: {converted_str}")
     
     # Create executable function
-    f = string_to_function(converted_str)
+    try:
+        f = string_to_function(converted_str)
+    except ValueError as e:
+        print(f"Invalid expression: {e}")
+        return
     
     # Test function at x=0
     try:
@@ -187,7 +247,8 @@ def main():
         return
     
     # Find sign change interval automatically from -100 to 100
-    interval = find_sign_change_interval(f, min_val=-100, max_val=100)
+    f_vec = string_to_function(converted_str, vectorized=True)
+    interval = find_sign_change_interval_vectorized(f_vec, min_val=-100, max_val=100)
     
     if interval is None:
         print("Could not find sign change automatically. Please enter interval manually.")
@@ -202,12 +263,13 @@ def main():
     else:
         a, b = interval
     
-    # Create derivative function
+    # Create derivative functions: exact f and f' in one pass, finite differences as fallback
     df = lambda x: numerical_derivative(f, x)
+    fdf = make_derivative(f)
     
     # Find root
     print("\nStarting hybrid root-finding algorithm...")
-    root = bisection_newton_hybrid(f, df, a, b)
+    root = bisection_newton_hybrid(f, df, a, b, fdf=fdf)
     
     if root is not None:
         print(f"\nApproximate root: {root:.16e}")
@@ -0,0 +1,198 @@
+import math
+
+from bracketed_solvers import EPS
+
+# Relative step of the forward differences used when no derivative is supplied
+DIFFERENCE_STEP = math.sqrt(EPS)
+
+
+def _converged(x_new, x, xtol):
+    return abs(x_new - x) <= 2 * EPS * abs(x_new) + xtol
+
+
+def _closer(x0, x1, fx0, fx1):
+    """x1 if both values are known and |f(x1)| < |f(x0)|, else x0"""
+    if x1 is not None and fx0 is not None and fx1 is not None and abs(fx1) < abs(fx0):
+        return x1
+    return x0
+
+
+def _start(f, x0, x1, fx0, fx1):
+    """
+    Picks the starting point: x0, or whichever of x0 and x1 has the smaller
+    |f| when a second point is known. Values passed in are used, not recomputed.
+    Returns (x, f(x), evaluations).
+    """
+    evaluations = 0
+    if fx0 is None:
+        fx0 = f(x0)
+        evaluations += 1
+    if x1 is not None and fx1 is not None and abs(fx1) < abs(fx0):
+        return x1, fx1, evaluations
+    return x0, fx0, evaluations
+
+
+def _slope(f, x, fx):
+    """Forward difference at x reusing the known f(x): one evaluation"""
+    h = DIFFERENCE_STEP * max(1.0, abs(x))
+    return (f(x + h) - fx) / h
+
+
+def newton(f, x0, x1=None, xtol=1e-15, max_iter=50, fdf=None, fx0=None, fx1=None):
+    """
+    Newton's method with value reuse: one fdf call per step, or f at the new
+    point plus one forward difference when fdf is not given (two calls where
+    newton_raphson with central differences makes four).
+    """
+    if fdf is not None:
+        x = _closer(x0, x1, fx0, fx1)
+        fx, dfx = fdf(x)
+        evaluations = 1
+    else:
+        x, fx, evaluations = _start(f, x0, x1, fx0, fx1)
+        dfx = None
+    for i in range(max_iter):
+        if math.isnan(fx):
+            return None, i, evaluations
+        if fx == 0:
+            return x, i, evaluations
+        if dfx is None:
+            dfx = _slope(f, x, fx)
+            evaluations += 1
+        if dfx == 0 or not math.isfinite(dfx):
+            return x, i, evaluations
+        x_new = x - fx / dfx
+        # A step below xtol ends the iteration before f is evaluated at its end
+        if _converged(x_new, x, xtol):
+            return x_new, i + 1, evaluations
+        if fdf is not None:
+            fx, dfx = fdf(x_new)
+        else:
+            fx, dfx = f(x_new), None
+        evaluations += 1
+        x = x_new
+    return x, max_iter, evaluations
+
+
+def secant(f, x0, x1=None, xtol=1e-15, max_iter=50, fdf=None, fx0=None, fx1=None):
+    """
+    Secant method: one evaluation per step and no derivative. The second
+    point defaults to a small step from x0; known values at either point are
+    reused (from a sign-change bracket, the first step costs nothing extra).
+    """
+    evaluations = 0
+    if x1 is None:
+        x1, fx1 = x0 + 1e-4 * max(1.0, abs(x0)), None
+    if fx0 is None:
+        fx0 = f(x0)
+        evaluations += 1
+    if fx1 is None:
+        fx1 = f(x1)
+        evaluations += 1
+    for i in range(max_iter):
+        if math.isnan(fx0) or math.isnan(fx1):
+            return None, i, evaluations
+        if fx1 == 0:
+            return x1, i, evaluations
+        if fx1 == fx0:
+            return x1, i, evaluations
+        x_new = x1 - fx1 * (x1 - x0) / (fx1 - fx0)
+        if _converged(x_new, x1, xtol):
+            return x_new, i + 1, evaluations
+        fx_new = f(x_new)
+        evaluations += 1
+        x0, fx0, x1, fx1 = x1, fx1, x_new, fx_new
+    return x1, max_iter, evaluations
+
+
+def steffensen(f, x0, x1=None, xtol=1e-15, max_iter=50, fdf=None, fx0=None, fx1=None):
+    """
+    Steffensen's method: the slope comes from f(x + f(x)), so convergence is
+    quadratic with two evaluations per step and no derivative. The step
+    f(x) is capped at 1e-3 of the scale of x, which only matters far from a
+    root, where the iteration then behaves like Newton's.
+    """
+    x, fx, evaluations = _start(f, x0, x1, fx0, fx1)
+    for i in range(max_iter):
+        if math.isnan(fx):
+            return None, i, evaluations
+        if fx == 0:
+            return x, i, evaluations
+        h = math.copysign(min(abs(fx), 1e-3 * max(1.0, abs(x))), fx)
+        slope = (f(x + h) - fx) / h
+        evaluations += 1
+        if slope == 0 or not math.isfinite(slope):
+            return x, i, evaluations
+        x_new = x - fx / slope
+        if _converged(x_new, x, xtol):
+            return x_new, i + 1, evaluations
+        fx = f(x_new)
+        evaluations += 1
+        x = x_new
+    return x, max_iter, evaluations
+
+
+def halley(f, x0, x1=None, xtol=1e-15, max_iter=50, fdf=None, fx0=None, fx1=None):
+    """
+    Halley's method with f'' taken from the change of f' over the last step,
+    so each step costs one fdf call (or two calls of f without fdf). The
+    first step is a Newton step; convergence is faster than Newton's once the
+    estimate of f'' settles.
+    """
+    if fdf is None:
+        def fdf(x):
+            fx = f(x)
+            return fx, _slope(f, x, fx)
+        calls = 2
+    else:
+        calls = 1
+    x = _closer(x0, x1, fx0, fx1)
+    fx, dfx = fdf(x)
+    evaluations = calls
+    x_prev = dfx_prev = None
+    for i in range(max_iter):
+        if math.isnan(fx):
+            return None, i, evaluations
+        if fx == 0:
+            return x, i, evaluations
+        if dfx == 0 or not math.isfinite(dfx):
+            return x, i, evaluations
+        d2fx = (dfx - dfx_prev) / (x - x_prev) if x_prev is not None and x != x_prev else 0.0
+        denominator = 2 * dfx * dfx - fx * d2fx
+        # Keep the Newton step where the correction would more than double it (or flip it)
+        if not denominator >= dfx * dfx:
+            x_new = x - fx / dfx
+        else:
+            x_new = x - 2 * fx * dfx / denominator
+        if _converged(x_new, x, xtol):
+            return x_new, i + 1, evaluations
+        x_prev, dfx_prev = x, dfx
+        fx, dfx = fdf(x_new)
+        evaluations += calls
+        x = x_new
+    return x, max_iter, evaluations
+
+
+OPEN_SOLVERS = {
+    'newton': newton,
+    'secant': secant,
+    'steffensen': steffensen,
+    'halley': halley,
+}
+
+
+def solve_open(f, x0, method='newton', x1=None, xtol=1e-15, max_iter=50, fdf=None, fx0=None, fx1=None):
+    """
+    Finds a root of f near x0 with the chosen open (unbracketed) method.
+    x1 is an optional second point and fx0, fx1 are values of f already
+    known; every solver reuses them and each value it computes.
+    fdf(x) -> (f(x), f'(x)) is used by 'newton' and 'halley'.
+    Returns (root, iterations, evaluations); root is None if f became
+    undefined. The root may lie anywhere, not only between x0 and x1.
+    """
+    try:
+        solver = OPEN_SOLVERS[method]
+    except KeyError:
+        raise ValueError(f"Unknown open method '{method}'. "
+                         f"Choose from: {', '.join(OPEN_SOLVERS)}") from None
+    return solver(f, x0, x1, xtol=xtol, max_iter=max_iter, fdf=fdf, fx0=fx0, fx1=fx1)
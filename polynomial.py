@@ -0,0 +1,203 @@
+import ast
+import math
+
+from expression_compiler import parse_expression, MATH_FUNCTIONS, MATH_CONSTANTS
+
+# Highest integer exponent expanded when extracting coefficients
+MAX_DEGREE = 64
+
+
+def _trim(p):
+    """Drops zero leading coefficients (the list is stored lowest degree first)"""
+    while len(p) > 1 and p[-1] == 0:
+        p.pop()
+    return p
+
+
+def _add(p, q, sign=1):
+    n = max(len(p), len(q))
+    p = p + [0.0] * (n - len(p))
+    q = q + [0.0] * (n - len(q))
+    return _trim([a + sign * b for a, b in zip(p, q)])
+
+
+def _mul(p, q):
+    result = [0.0] * (len(p) + len(q) - 1)
+    for i, a in enumerate(p):
+        if a == 0:
+            continue
+        for j, b in enumerate(q):
+            result[i + j] += a * b
+    return _trim(result)
+
+
+def _to_poly(node, variable):
+    """Returns the coefficients (lowest degree first) of node, or None if it is not a polynomial"""
+    if isinstance(node, ast.Constant):
+        return [float(node.value)]
+
+    if isinstance(node, ast.Name):
+        if node.id == variable:
+            return [0.0, 1.0]
+        if node.id in MATH_CONSTANTS:
+            return [MATH_CONSTANTS[node.id]]
+        return None
+
+    if isinstance(node, ast.UnaryOp):
+        p = _to_poly(node.operand, variable)
+        if p is None:
+            return None
+        return p if isinstance(node.op, ast.UAdd) else [-a for a in p]
+
+    if isinstance(node, ast.Call):
+        # Calls with constant arguments (e.g. sqrt(2)) are just numbers
+        args = [_to_poly(arg, variable) for arg in node.args]
+        if any(a is None or len(a) > 1 for a in args):
+            return None
+        try:
+            return [float(MATH_FUNCTIONS[node.func.id](*(a[0] for a in args)))]
+        except (ValueError, ZeroDivisionError, OverflowError):
+            return None
+
+    if isinstance(node, ast.BinOp):
+        p = _to_poly(node.left, variable)
+        q = _to_poly(node.right, variable)
+        if p is None or q is None:
+            return None
+        op = node.op
+        if isinstance(op, ast.Add):
+            return _add(p, q)
+        if isinstance(op, ast.Sub):
+            return _add(p, q, -1)
+        if isinstance(op, ast.Mult):
+            return _mul(p, q)
+        if isinstance(op, ast.Div):
+            if len(q) > 1 or q[0] == 0:
+                return None
+            return [a / q[0] for a in p]
+        if isinstance(op, ast.Pow):
+            if len(q) > 1:
+                return None
+            n = q[0]
+            if len(p) == 1:
+                try:
+                    value = p[0] ** n
+                except (ZeroDivisionError, OverflowError):
+                    return None
+                # A negative base with a fractional exponent is complex: not a real polynomial
+                return None if isinstance(value, complex) else [float(value)]
+            if n != int(n) or n < 0 or n * (len(p) - 1) > MAX_DEGREE:
+                return None
+            result = [1.0]
+            for _ in range(int(n)):
+                result = _mul(result, p)
+            return result
+        return None
+
+    return None
+
+
+def polynomial_coefficients(expr: str, variable='x'):
+    """
+    Detects whether an expression is a polynomial in x.
+    Returns its coefficients, highest degree first (the NumPy convention),
+    or None when the expression is not a polynomial of degree >= 1.
+    """
+    tree = parse_expression(expr, variables=(variable,))
+    p = _to_poly(tree.body, variable)
+    if p is None or len(p) < 2 or not all(math.isfinite(a) for a in p):
+        return None
+    return p[::-1]
+
+
+def horner(coeffs, x):
+    """Evaluates p(x) and p'(x) together with Horner's scheme (coefficients highest degree first)"""
+    p = coeffs[0]
+    dp = 0
+    for c in coeffs[1:]:
+        dp = dp * x + p
+        p = p * x + c
+    return p, dp
+
+
+def _polish(coeffs, z, multiplicity, tol=1e-15, max_iter=20):
+    """Refines an eigenvalue with Newton steps (scaled by the multiplicity)"""
+    p, dp = horner(coeffs, z)
+    for i in range(max_iter):
+        if p == 0 or dp == 0:
+            return z, i
+        z_new = z - multiplicity * p / dp
+        p_new, dp_new = horner(coeffs, z_new)
+        # Stop once the residual no longer improves (limiting accuracy reached)
+        if abs(p_new) >= abs(p):
+            return z, i
+        converged = abs(z_new - z) <= tol * max(1.0, abs(z_new))
+        z, p, dp = z_new, p_new, dp_new
+        if converged:
+            return z, i + 1
+    return z, max_iter
+
+
+def polynomial_roots(coeffs, include_complex=False, cluster_eps=1e-14, imag_tol=1e-8):
+    """
+    Finds every root of a polynomial at once (coefficients highest degree first).
+    Roots are the eigenvalues of the companion matrix; nearby eigenvalues are
+    merged into one multiple root, whose mean is far more accurate than the
+    individual values, and each root is polished with Horner-based Newton steps.
+    Returns a list of (root, multiplicity, iterations) sorted by real part;
+    complex roots are only included when include_complex is True.
+    """
+    import numpy as np  # only needed for the eigenvalue solve
+
+    coeffs = [float(c) for c in coeffs]
+    while coeffs and coeffs[0] == 0:
+        coeffs.pop(0)
+    if len(coeffs) < 2:
+        return []
+
+    # Factor out x**k: zero roots are exact
+    zeros = 0
+    while coeffs[-1] == 0:
+        coeffs.pop()
+        zeros += 1
+
+    eigenvalues = []
+    if len(coeffs) > 1:
+        companion = np.diag(np.ones(len(coeffs) - 2), -1)
+        companion[0, :] = -np.asarray(coeffs[1:]) / coeffs[0]
+        eigenvalues = sorted(np.linalg.eigvals(companion).tolist(), key=lambda z: (z.real, z.imag))
+
+    # Group eigenvalues that belong to the same multiple root: an m-fold root
+    # is perturbed into m eigenvalues spread over about cluster_eps**(1/m)
+    clusters = []
+    remaining = eigenvalues
+    while remaining:
+        z = remaining[0]
+        nearest = sorted(remaining, key=lambda w: abs(w - z))
+        for m in range(len(nearest), 0, -1):
+            cluster = nearest[:m]
+            center = sum(cluster) / m
+            radius = cluster_eps ** (1 / m) * max(1.0, abs(center))
+            if all(abs(w - center) <= radius for w in cluster):
+                break
+        clusters.append(cluster)
+        remaining = [w for w in remaining if all(w is not c for c in cluster)]
+
+    roots = [(0.0, zeros, 0)] if zeros else []
+    for cluster in clusters:
+        multiplicity = len(cluster)
+        z = complex(sum(cluster) / multiplicity)
+        is_real = abs(z.imag) <= imag_tol * max(1.0, abs(z))
+        if not is_real and not include_complex:
+            continue
+        if is_real:
+            root, iters = _polish(coeffs, z.real, multiplicity)
+        else:
+            root, iters = _polish(coeffs, z, multiplicity)
+            if abs(root.imag) <= imag_tol * max(1.0, abs(root)):
+                root = root.real
+        roots.append((root, multiplicity, iters))
+
+    roots.sort(key=lambda r: (r[0].real, r[0].imag) if isinstance(r[0], complex) else (r[0], 0.0))
+    return roots
+
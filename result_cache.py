@@ -0,0 +1,146 @@
+import json
+import os
+import sqlite3
+import time
+
+from root_set import Root
+
+# Seconds between refreshes of an entry's last-used time (keeps hits read-only most of the time)
+TOUCH_INTERVAL = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+
+def normalize_expression(converted: str):
+    """Canonical form of a convert_power_notation result used in cache keys"""
+    return ''.join(converted.split())
+
+
+# Options that change how a solve runs or reports, never its roots: left out of the keys
+RUNTIME_OPTIONS = frozenset({'tracer', 'metrics', 'workers', 'executor', 'sandbox'})
+
+
+def cache_key(converted, **params):
+    """
+    Key for an expression and every parameter that can change its roots.
+    Returns None when one of them has no JSON form (a callable such as fdf):
+    such solves cannot be looked up and bypass the cache.
+    """
+    params = sorted((name, value) for name, value in params.items() if name not in RUNTIME_OPTIONS)
+    try:
+        return json.dumps([normalize_expression(converted), params], separators=(',', ':'))
+    except (TypeError, ValueError):
+        return None
+
+
+class ResultCache:
+    """
+    Persistent cache of root-finding results in an SQLite file.
+    Entries are keyed by the normalized expression plus the search parameters
+    and hold the full root records. WAL journaling and a busy timeout let
+    several processes read and write the same file; writes run in immediate
+    transactions. When the stored payloads exceed max_bytes the least
+    recently used entries are evicted. With enabled=False every lookup misses
+    and nothing is written.
+    """
+
+    def __init__(self, path, max_bytes=64 * 2 ** 20, enabled=True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def get(self, key):
+        """Returns (roots, evaluations) for a stored key, roots being Root records, or None"""
+        if not self.enabled:
+            self.misses += 1
+            return None
+        row = self.connection.execute("SELECT payload, last_used FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        payload, last_used = row
+        now = time.time()
+        if now - last_used > TOUCH_INTERVAL:
+            self.connection.execute("UPDATE results SET last_used = ? WHERE key = ?", (now, key))
+        data = json.loads(payload)
+        # Entries written before a field was added are shorter; Root fills in its defaults
+        roots = [Root(x, iterations, method, residual, tuple(bracket) if bracket else None, *rest)
+                 for x, iterations, method, residual, bracket, *rest in data['roots']]
+        return roots, data['evaluations']
+
+    def put(self, key, roots, evaluations=0):
+        """Stores the Root records found for a key and evicts old entries above max_bytes"""
+        if not self.enabled:
+            return
+        payload = json.dumps({'roots': [list(r) for r in roots], 'evaluations': evaluations})
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                               (key, payload, len(payload), time.time()))
+            total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total > self.max_bytes:
+                # Drop the least recently used entries until the payloads fit again
+                excess = total - self.max_bytes
+                for old_key, size in connection.execute(
+                        "SELECT key, size FROM results WHERE key != ? ORDER BY last_used", (key,)).fetchall():
+                    if excess <= 0:
+                        break
+                    connection.execute("DELETE FROM results WHERE key = ?", (old_key,))
+                    excess -= size
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def clear(self):
+        self.connection.execute("DELETE FROM results")
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# One open cache per file and process: SQLite connections must not cross a fork
+_open_caches = {}
+
+
+def open_cache(path, **options):
+    """Returns the ResultCache for path in this process, opening it on first use"""
+    key = (os.getpid(), os.path.abspath(path))
+    cache = _open_caches.get(key)
+    if cache is None:
+        cache = _open_caches[key] = ResultCache(path, **options)
+    return cache
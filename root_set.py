@@ -0,0 +1,65 @@
+import math
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+# One accepted root and how it was obtained; bracket is (a, b) or None, evaluations
+# the calls of f (or fdf) spent refining it, None when the method does not count them
+Root = namedtuple('Root', ['x', 'iterations', 'method', 'residual', 'bracket', 'evaluations'], defaults=(None,))
+
+
+class RootSet:
+    """
+    Roots kept sorted by position, with near-duplicate detection.
+    Positions are stored in a compact array of doubles searched with bisect,
+    so checking a candidate against the accepted roots is O(log n) instead
+    of a scan over all of them. Each root's metadata lives in a Root record.
+    Complex roots, when a solver reports them, are kept apart in complex_roots.
+    """
+
+    def __init__(self, tol=1e-10):
+        self.tol = tol
+        self._xs = array('d')
+        self._records = []
+        self.complex_roots = []
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __getitem__(self, index):
+        return self._records[index]
+
+    def __repr__(self):
+        return f"RootSet({[r.x for r in self._records]!r}, tol={self.tol!r})"
+
+    def find_near(self, x):
+        """Returns the accepted root closest to x if it lies within tol, else None"""
+        i = bisect_left(self._xs, x)
+        best = None
+        for j in (i - 1, i):
+            if 0 <= j < len(self._xs) and abs(self._xs[j] - x) < self.tol:
+                if best is None or abs(self._xs[j] - x) < abs(self._xs[best] - x):
+                    best = j
+        return None if best is None else self._records[best]
+
+    def add(self, x, iterations=0, method=None, residual=math.nan, bracket=None, evaluations=None):
+        """Inserts a root unless one lies within tol; returns the new Root or None for a duplicate"""
+        if self.find_near(x) is not None:
+            return None
+        record = Root(x, iterations, method, residual, bracket, evaluations)
+        i = bisect_left(self._xs, x)
+        self._xs.insert(i, x)
+        self._records.insert(i, record)
+        return record
+
+    @property
+    def xs(self):
+        """Root positions in ascending order"""
+        return list(self._xs)
+
+    def as_lists(self):
+        """Returns (roots, iterations, methods) as aligned lists in ascending order"""
+        return (self.xs, [r.iterations for r in self._records], [r.method for r in self._records])
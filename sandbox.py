@@ -0,0 +1,122 @@
+import multiprocessing
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from batch import SolveResult, solve_one
+
+try:
+    import resource  # memory limits are only available on Unix
+except ImportError:
+    resource = None
+
+
+def _serve(connection, max_memory):
+    """Worker loop: solves (expression, search_range, options) messages until None arrives"""
+    if max_memory and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory, max_memory))
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        expression, search_range, options = message
+        connection.send(solve_one(expression, search_range, **options))
+
+
+class Sandbox:
+    """
+    A worker process that solves expressions under hard limits.
+    Each solve must finish within timeout seconds of wall-clock time, or the
+    worker is killed and replaced; max_memory caps the worker's address
+    space in bytes (Unix only), so a runaway allocation fails with
+    MemoryError inside the worker. max_evaluations is passed on to
+    find_root_set. Overruns come back as SolveResults whose error field
+    names the limit, never as exceptions in the caller.
+    """
+
+    def __init__(self, timeout=5.0, max_memory=None, max_evaluations=None):
+        self.timeout = timeout
+        self.max_memory = max_memory
+        self.max_evaluations = max_evaluations
+        self.restarts = 0
+        self._process = None
+        self._connection = None
+
+    def _start(self):
+        self._connection, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_serve, args=(child, self.max_memory), daemon=True)
+        self._process.start()
+        child.close()
+
+    def _kill(self):
+        self._process.kill()
+        self._process.join()
+        self._connection.close()
+        self._process = self._connection = None
+        self.restarts += 1
+
+    def solve(self, expression, search_range=(-100, 100), **options):
+        """Solves one expression like batch.solve_one and returns its SolveResult"""
+        if self._process is None or not self._process.is_alive():
+            if self._process is not None:
+                self._kill()
+            self._start()
+        if self.max_evaluations is not None:
+            options.setdefault('max_evaluations', self.max_evaluations)
+
+        try:
+            self._connection.send((expression, search_range, options))
+            if self._connection.poll(self.timeout):
+                return self._connection.recv()
+            error = f"TimeoutError: no result within {self.timeout} s"
+        except (EOFError, OSError):
+            error = f"WorkerDied: exit code {self._process.exitcode}"
+        self._kill()
+        return SolveResult(expression, None, [], [], [], 0, error)
+
+    def close(self):
+        if self._process is not None:
+            try:
+                self._connection.send(None)
+            except OSError:
+                pass
+            self._process.join(1)
+            if self._process.is_alive():
+                self._process.kill()
+            self._connection.close()
+            self._process = self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def solve_sandboxed(expressions, search_range=(-100, 100), workers=None, timeout=5.0, max_memory=None,
+                    max_evaluations=None, **options):
+    """
+    Solves many expressions like batch.solve_many, each in a Sandbox.
+    A hanging or exploding expression costs at most timeout seconds of one
+    worker and only marks its own result, so the batch keeps its pace.
+    Returns the SolveResults in input order.
+    """
+    expressions = list(expressions)
+    workers = workers or os.cpu_count() or 1
+    sandboxes = queue.Queue()
+    for _ in range(workers):
+        sandboxes.put(Sandbox(timeout, max_memory, max_evaluations))
+
+    def solve(expression):
+        sandbox = sandboxes.get()
+        try:
+            return sandbox.solve(expression, search_range, **options)
+        finally:
+            sandboxes.put(sandbox)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(solve, expressions))
+    finally:
+        while not sandboxes.empty():
+            sandboxes.get().close()
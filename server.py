@@ -0,0 +1,275 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from batch import SolveResult
+from deepseek_conjunto import find_root_set
+from expression_compiler import CachedFunction, compile_expression, convert_power_notation, ignore_error
+from solve_stream import parse_line
+from tracing import SILENT, Tracer
+
+# Latencies kept for the percentiles of the stats endpoint
+LATENCY_WINDOW = 1000
+
+
+def _compile(converted):
+    return compile_expression(converted, on_error=ignore_error)
+
+
+# Per-process LRU of compiled expressions, sized by _init_worker
+_compiled = lru_cache(maxsize=256)(_compile)
+
+
+def _init_worker(cache_size):
+    global _compiled
+    _compiled = lru_cache(maxsize=cache_size)(_compile)
+
+
+def _solve_request(expression, search_range, tol, options):
+    """Runs in a pool process: one find_root_set call with the compiled function reused across requests"""
+    converted = None
+    try:
+        converted = convert_power_notation(expression)
+        hits = _compiled.cache_info().hits
+        f = CachedFunction(_compiled(converted), maxsize=4096)
+        compile_cached = _compiled.cache_info().hits > hits
+        roots, iterations, methods = find_root_set(f, search_range, tracer=Tracer(SILENT), xtol=tol,
+                                                   **options).as_lists()
+        result = SolveResult(expression, converted, roots, iterations, methods, f.cache_info().misses, None)
+    except Exception as e:
+        result = SolveResult(expression, converted, [], [], [], 0, f"{type(e).__name__}: {e}")
+        compile_cached = False
+    return {**result._asdict(), 'compile_cached': compile_cached}
+
+
+def _is_stats_request(line):
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return False
+    return isinstance(data, dict) and data.get('op') == 'stats'
+
+
+def _percentile(ordered, q):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class RootServer:
+    """
+    Local root-finding server speaking newline-delimited JSON over TCP.
+    Each request line is an expression or a JSON object in the solve_stream
+    format ({"expression": ..., "range": [a, b], "tol": ..., "id": ...}); the
+    reply is one JSON line with the roots, echoing the id. Replies of one
+    connection may arrive out of order when several requests are pipelined.
+    The line {"op": "stats"} returns throughput, latency percentiles and the
+    compiled-expression cache hit rate.
+
+    Solves run in a process pool whose workers keep an LRU of compiled
+    expressions, so the event loop only parses and routes. At most
+    max_pending solves are queued or running; beyond that the server stops
+    reading from clients until a slot frees up, pushing back through TCP.
+    A request taking longer than timeout seconds is answered with an error;
+    its slot is held until the worker actually finishes.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8765, workers=None, max_pending=64, timeout=10.0,
+                 cache_size=256, search_range=(-100, 100), tol=1e-15):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self.search_range = search_range
+        self.tol = tol
+        self._pool = None
+        self._server = None
+        self._slots = None
+        self._pending = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._started = None
+        self.completed = self.errors = self.timeouts = 0
+        self.cache_hits = self.cache_misses = 0
+
+    async def start(self):
+        """Starts the pool and listens; port=0 picks a free port, available afterwards in self.port"""
+        # Workers are spawned, not forked: a fork would inherit open client sockets and keep them alive
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                         initializer=_init_worker, initargs=(self.cache_size,))
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._started = time.perf_counter()
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def stats(self):
+        """Counters since start; latencies (seconds) cover the last LATENCY_WINDOW requests"""
+        uptime = time.perf_counter() - self._started if self._started else 0.0
+        ordered = sorted(self._latencies)
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'uptime': uptime,
+            'completed': self.completed,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'pending': self._pending,
+            'throughput': self.completed / uptime if uptime else 0.0,
+            'latency_p50': _percentile(ordered, 0.50),
+            'latency_p90': _percentile(ordered, 0.90),
+            'latency_p99': _percentile(ordered, 0.99),
+            'cache_hit_rate': self.cache_hits / lookups if lookups else None,
+        }
+
+    async def _handle_connection(self, reader, writer):
+        tasks = set()
+        lock = asyncio.Lock()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                line = line.decode()
+                if line.strip() == '':
+                    continue
+                if _is_stats_request(line):
+                    await self._reply(writer, lock, self.stats())
+                    continue
+                # Waiting for a slot here stops reading from the socket: backpressure
+                await self._slots.acquire()
+                self._pending += 1
+                task = asyncio.create_task(self._answer(line, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _answer(self, line, writer, lock):
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        record = {}
+        submitted = False
+        try:
+            parsed = parse_line(line)
+        except (ValueError, KeyError, TypeError) as e:
+            parsed = None
+            record['error'] = f"Invalid request: {e}"
+        try:
+            if parsed is not None:
+                expression, options = parsed
+                if 'id' in options:
+                    record['id'] = options.pop('id')
+                search_range = tuple(options.pop('range', self.search_range))
+                tol = options.pop('tol', self.tol)
+                future = self._pool.submit(_solve_request, expression, search_range, tol, options)
+                # The slot is freed when the worker is done, even after a timeout
+                future.add_done_callback(lambda _: self._release_from_thread(loop))
+                submitted = True
+                try:
+                    result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.timeout)
+                except asyncio.TimeoutError:
+                    future.cancel()
+                    self.timeouts += 1
+                    result = {'expression': expression, 'error': f"Timed out after {self.timeout} s"}
+                record.update(result)
+        finally:
+            if not submitted:
+                self._release()
+
+        if 'compile_cached' in record:
+            if record['compile_cached']:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+        if record.get('error') is not None:
+            self.errors += 1
+        self.completed += 1
+        self._latencies.append(time.perf_counter() - start)
+        await self._reply(writer, lock, record)
+
+    def _release(self):
+        self._pending -= 1
+        self._slots.release()
+
+    def _release_from_thread(self, loop):
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(self._release)
+
+    @staticmethod
+    async def _reply(writer, lock, record):
+        async with lock:
+            writer.write((json.dumps(record) + '\n').encode())
+            await writer.drain()
+
+
+async def query(lines, host='127.0.0.1', port=8765):
+    """Client helper: sends request lines (strings or dicts) and returns the replies in arrival order"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for line in lines:
+            writer.write(((json.dumps(line) if isinstance(line, dict) else line) + '\n').encode())
+        await writer.drain()
+        return [json.loads(await reader.readline()) for _ in lines]
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Local root-finding server (newline-delimited JSON over TCP)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, help="solver processes (default: all cores)")
+    parser.add_argument('--max-pending', type=int, default=64, help="solves queued or running before backpressure")
+    parser.add_argument('--timeout', type=float, default=10.0, help="seconds per request")
+    parser.add_argument('--cache-size', type=int, default=256, help="compiled expressions kept per worker")
+    parser.add_argument('--range', nargs=2, type=float, default=(-100, 100), metavar=('MIN', 'MAX'))
+    parser.add_argument('--tol', type=float, default=1e-15)
+    args = parser.parse_args(argv)
+
+    async def run():
+        server = RootServer(args.host, args.port, args.workers, args.max_pending, args.timeout,
+                            args.cache_size, tuple(args.range), args.tol)
+        async with server:
+            print(f"Listening on {server.host}:{server.port}")
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,180 @@
+import argparse
+import json
+import math
+import os
+import sys
+
+from batch import solve_one
+from expression_compiler import compile_expression, compile_vectorized, ignore_error
+from metrics import Metrics
+from result_cache import open_cache
+from sandbox import Sandbox
+from tracing import SILENT, Tracer
+import new_deepseek
+
+# Keys accepted in a JSON input line besides the expression itself
+LINE_OPTIONS = ('range', 'tol', 'step', 'bracket_method', 'scan', 'open_method')
+
+
+def parse_line(line):
+    """
+    Reads one input line: either a bare expression or a JSON object such as
+    {"expression": "x**2 - 2", "range": [-5, 5], "tol": 1e-12, "id": 7}.
+    Returns (expression, options) or None for blank lines and # comments.
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    if not line.startswith('{'):
+        return line, {}
+    data = json.loads(line)
+    options = {key: data[key] for key in LINE_OPTIONS if key in data}
+    if 'id' in data:
+        options['id'] = data['id']
+    return data['expression'], options
+
+
+def solve_all(expression, search_range, tol, vectorized, step=0.5, bracket_method='brent', scan='uniform',
+              open_method=None, cache=None, sandbox=None, **limits):
+    """
+    deepseek_conjunto behaviour: every root in the range, looked up in cache
+    first if given; with a Sandbox the solve runs in its worker process.
+    """
+    solve = sandbox.solve if sandbox is not None else solve_one
+    if open_method is not None:
+        # Only passed when set, so cache keys of the default pipeline stay the same
+        limits['open_method'] = open_method
+    result = solve(expression, search_range, vectorized=vectorized, cache=cache, xtol=tol, step=step,
+                   bracket_method=bracket_method, scan=scan, **limits)
+    return result._asdict()
+
+
+def solve_single(expression, search_range, tol, vectorized, step=1.0, **unused):
+    """new_deepseek behaviour: the root in the first sign-change interval"""
+    result = {'expression': expression, 'converted': None, 'roots': [], 'error': None}
+    try:
+        converted = result['converted'] = new_deepseek.convert_power_notation(expression)
+        f = compile_expression(converted, on_error=ignore_error)
+        tracer = Tracer(SILENT)
+        if vectorized:
+            interval = new_deepseek.find_sign_change_interval_vectorized(compile_vectorized(converted),
+                                                                         *search_range, step, tracer)
+        else:
+            interval = new_deepseek.find_sign_change_interval(f, *search_range, step, tracer)
+        if interval is None:
+            return result
+        a, b = interval
+        if a == b:
+            root = a
+        else:
+            fdf = new_deepseek.make_derivative(f)
+            root = new_deepseek.bisection_newton_hybrid(f, lambda x: new_deepseek.numerical_derivative(f, x),
+                                                        a, b, tol_newton=tol, fdf=fdf, tracer=tracer)
+        if root is not None and not math.isnan(root):
+            result['roots'] = [root]
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+
+MODES = {'all': solve_all, 'single': solve_single}
+
+
+def stream(lines, out, mode='all', search_range=(-100, 100), tol=1e-15, vectorized=False, **defaults):
+    """
+    Solves the expressions of an iterable of lines, writing one JSON object per
+    line to out as soon as each one finishes. Lines are consumed one at a time,
+    so memory does not grow with the input size. Returns the number of failures.
+    """
+    solve = MODES[mode]
+    failures = 0
+    for number, line in enumerate(lines, 1):
+        try:
+            parsed = parse_line(line)
+        except (ValueError, KeyError, TypeError) as e:
+            out.write(json.dumps({'line': number, 'error': f"Invalid input line: {e}"}) + '\n')
+            failures += 1
+            continue
+        if parsed is None:
+            continue
+
+        expression, options = parsed
+        record = {'line': number}
+        if 'id' in options:
+            record['id'] = options.pop('id')
+        line_range = options.pop('range', search_range)
+        line_tol = options.pop('tol', tol)
+        record.update(solve(expression, tuple(line_range), line_tol, vectorized, **{**defaults, **options}))
+        if record['error'] is not None:
+            failures += 1
+        out.write(json.dumps(record) + '\n')
+        out.flush()
+    return failures
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description="Reads one expression per line (plain text or JSON) and writes one JSON result per line")
+    parser.add_argument('input', nargs='?', default='-', help="input file, '-' for stdin (default)")
+    parser.add_argument('--mode', choices=list(MODES), default='all',
+                        help="'all' finds every root in the range (deepseek_conjunto), "
+                             "'single' the root of the first sign change (new_deepseek)")
+    parser.add_argument('--range', nargs=2, type=float, default=(-100, 100), metavar=('MIN', 'MAX'))
+    parser.add_argument('--tol', type=float, default=1e-15, help="solver convergence tolerance")
+    parser.add_argument('--step', type=float, help="scan step (0.5 in 'all' mode, 1.0 in 'single' mode)")
+    parser.add_argument('--bracket-method', default='brent', help="bracketed solver used in 'all' mode")
+    parser.add_argument('--scan', choices=['uniform', 'adaptive', 'interval', 'chebyshev'], default='uniform')
+    parser.add_argument('--open-method', choices=['newton', 'secant', 'steffensen', 'halley'],
+                        help="open solver tried before the bracketed one in 'all' mode")
+    parser.add_argument('--vectorized', action='store_true', help="scan with NumPy arrays")
+    parser.add_argument('--cache', metavar='PATH', default=os.environ.get('ROOTS_CACHE'),
+                        help="SQLite file of cached results in 'all' mode (default: $ROOTS_CACHE)")
+    parser.add_argument('--no-cache', action='store_true', help="bypass the result cache")
+    parser.add_argument('--timeout', type=float, help="seconds per expression in 'all' mode (runs in a sandbox)")
+    parser.add_argument('--max-memory', type=int, metavar='MB', help="memory limit of the sandbox process")
+    parser.add_argument('--max-evaluations', type=int, help="function evaluations allowed per expression")
+    parser.add_argument('--metrics', metavar='PATH',
+                        help="write solver metrics of 'all' mode to PATH (JSON if it ends in .json, else Prometheus)")
+    args = parser.parse_args(argv)
+    if args.metrics and (args.timeout is not None or args.max_memory is not None):
+        parser.error("--metrics cannot be collected from the sandbox of --timeout/--max-memory")
+
+    defaults = {}
+    if args.step is not None:
+        defaults['step'] = args.step
+    if args.mode == 'all':
+        defaults.update(bracket_method=args.bracket_method, scan=args.scan, open_method=args.open_method)
+        if args.metrics:
+            defaults['metrics'] = Metrics()
+        if args.max_evaluations is not None:
+            defaults['max_evaluations'] = args.max_evaluations
+        if args.timeout is not None or args.max_memory is not None:
+            max_memory = args.max_memory * 2 ** 20 if args.max_memory else None
+            defaults['sandbox'] = Sandbox(args.timeout, max_memory)
+        if args.cache and not args.no_cache:
+            # The sandbox process opens the cache file itself
+            defaults['cache'] = args.cache if 'sandbox' in defaults else open_cache(args.cache)
+
+    source = sys.stdin if args.input == '-' else open(args.input)
+    try:
+        failures = stream(source, sys.stdout, args.mode, tuple(args.range), args.tol, args.vectorized,
+                          **defaults)
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head); stop quietly
+        sys.stdout = open(os.devnull, 'w')
+        return 0
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if 'sandbox' in defaults:
+            defaults['sandbox'].close()
+        if args.metrics:
+            with open(args.metrics, 'w') as out:
+                metrics = defaults['metrics']
+                out.write(metrics.to_json(indent=2) if args.metrics.endswith('.json') else metrics.to_prometheus())
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+import ast
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from autodiff import compile_jacobian
+from expression_compiler import compile_expression, compile_vectorized, ignore_error, MATH_FUNCTIONS, MATH_CONSTANTS
+
+# Largest max-norm residual accepted as a solution when the iteration stalls
+RESIDUAL_TOL = 1e-8
+
+# Outcome of one solve; f_evals counts points where F was evaluated, jac_evals Jacobian calls
+SystemResult = namedtuple('SystemResult', ['x', 'converged', 'iterations', 'f_evals', 'jac_evals',
+                                           'residual', 'method'])
+
+
+def free_variables(expressions):
+    """Names used in the expressions that are not math functions or constants, sorted"""
+    names = set()
+    for expr in expressions:
+        try:
+            tree = ast.parse(expr.strip(), mode='eval')
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression '{expr}': {e.msg}") from None
+        names.update(node.id for node in ast.walk(tree) if isinstance(node, ast.Name)
+                     and node.id not in MATH_FUNCTIONS and node.id not in MATH_CONSTANTS)
+    return tuple(sorted(names))
+
+
+class System:
+    """
+    A system of equations F(v) = 0, one expression per equation, compiled once.
+    Provides F and its Jacobian either by forward-mode automatic differentiation
+    or by finite differences evaluated on all shifted points in one array call.
+    Evaluations are counted in f_evals (points) and jac_evals (AD Jacobians).
+    """
+
+    def __init__(self, expressions, variables=None):
+        self.expressions = tuple(expressions)
+        self.variables = tuple(variables) if variables else free_variables(self.expressions)
+        if not self.variables:
+            raise ValueError("The system has no variables")
+        self._f = [compile_expression(expr, ignore_error, self.variables) for expr in self.expressions]
+        self._f_vec = [compile_vectorized(expr, self.variables) for expr in self.expressions]
+        self._fj = compile_jacobian(self.expressions, self.variables, ignore_error)
+        self.f_evals = 0
+        self.jac_evals = 0
+
+    def F(self, v):
+        """Residual vector at v"""
+        self.f_evals += 1
+        return np.array([f(*v) for f in self._f], dtype=float)
+
+    def jacobian_ad(self, v):
+        """(F(v), J(v)) from automatic differentiation, in one call"""
+        self.jac_evals += 1
+        values, rows = self._fj(*v)
+        if values is None:
+            n = len(self.expressions)
+            return np.full(n, np.nan), np.full((n, len(self.variables)), np.nan)
+        return np.array(values, dtype=float), np.array(rows, dtype=float)
+
+    def jacobian_fd(self, v, fv=None, h=1e-7):
+        """(F(v), J(v)) from forward differences; F is evaluated on all shifted points at once"""
+        v = np.asarray(v, dtype=float)
+        n = len(v)
+        steps = h * np.maximum(1.0, np.abs(v))
+        points = np.tile(v, (n + 1, 1))
+        points[1:] += np.diag(steps)
+        values = np.array([f_vec(*points.T) for f_vec in self._f_vec])
+        self.f_evals += n + 1 if fv is None else n
+        fv = values[:, 0] if fv is None else fv
+        return fv, (values[:, 1:] - fv[:, None]) / steps
+
+    def jacobian(self, v, method='ad', fv=None):
+        if method == 'ad':
+            return self.jacobian_ad(v)
+        if method == 'fd':
+            return self.jacobian_fd(v, fv)
+        raise ValueError(f"Unknown Jacobian method '{method}', use 'ad' or 'fd'")
+
+    def reset_counts(self):
+        self.f_evals = self.jac_evals = 0
+
+
+def _linear_step(J, fv):
+    """Solves J dx = -F, by least squares when J is singular or not square"""
+    if J.shape[0] == J.shape[1]:
+        try:
+            return np.linalg.solve(J, -fv)
+        except np.linalg.LinAlgError:
+            pass
+    return np.linalg.lstsq(J, -fv, rcond=None)[0]
+
+
+def _stalled(fv, dx, x, tol):
+    """True when the residual is below tol or the step no longer moves x"""
+    return np.max(np.abs(fv)) < tol or np.max(np.abs(dx)) <= tol * (1 + np.max(np.abs(x)))
+
+
+def _result(x, fv, iterations, system, method, tol):
+    """Builds the SystemResult; a solve counts as converged when the residual is small"""
+    residual = float(np.max(np.abs(fv))) if np.all(np.isfinite(fv)) else math.nan
+    converged = residual < max(tol, RESIDUAL_TOL)
+    return SystemResult(x, converged, iterations, system.f_evals, system.jac_evals, residual, method)
+
+
+def newton_system(system, x0, tol=1e-12, max_iter=50, jacobian='ad'):
+    """Newton's method for F(v) = 0; the Jacobian is recomputed every iteration"""
+    system.reset_counts()
+    x = np.array(x0, dtype=float)
+    fv = dx = None
+    for i in range(max_iter):
+        fv, J = system.jacobian(x, jacobian, fv)
+        if not (np.all(np.isfinite(fv)) and np.all(np.isfinite(J))) \
+                or (dx is not None and _stalled(fv, dx, x, tol)) or np.max(np.abs(fv)) < tol:
+            return _result(x, fv, i, system, 'newton', tol)
+
+        dx = _linear_step(J, fv)
+        x = x + dx
+        # With finite differences F(x) is needed anyway and reused by the next Jacobian
+        fv = system.F(x) if jacobian == 'fd' else None
+        if fv is not None and _stalled(fv, dx, x, tol):
+            return _result(x, fv, i + 1, system, 'newton', tol)
+
+    return _result(x, system.F(x) if fv is None else fv, max_iter, system, 'newton', tol)
+
+
+def broyden_system(system, x0, tol=1e-12, max_iter=100, jacobian='ad'):
+    """
+    Broyden's quasi-Newton method ("good" update on the inverse Jacobian).
+    The Jacobian is computed once at the start and then corrected by rank-one
+    updates from successive residuals, so each iteration costs a single F
+    evaluation. It is recomputed only when the updates stop making progress.
+    """
+    system.reset_counts()
+    x = np.array(x0, dtype=float)
+    fv, J = system.jacobian(x, jacobian)
+    if not (np.all(np.isfinite(fv)) and np.all(np.isfinite(J))):
+        return _result(x, fv, 0, system, 'broyden', tol)
+    H = np.linalg.pinv(J)
+
+    for i in range(max_iter):
+        if np.max(np.abs(fv)) < tol:
+            return _result(x, fv, i, system, 'broyden', tol)
+
+        dx = -H @ fv
+        x_new = x + dx
+        f_new = system.F(x_new)
+        if not np.all(np.isfinite(f_new)) or np.max(np.abs(f_new)) > 2 * np.max(np.abs(fv)):
+            # The secant model went stale: take a fresh Jacobian at x
+            fv, J = system.jacobian(x, jacobian, fv)
+            if not np.all(np.isfinite(J)):
+                return _result(x, fv, i, system, 'broyden', tol)
+            H = np.linalg.pinv(J)
+            dx = -H @ fv
+            x_new = x + dx
+            f_new = system.F(x_new)
+            if not np.all(np.isfinite(f_new)):
+                return _result(x, fv, i, system, 'broyden', tol)
+
+        df = f_new - fv
+        Hdf = H @ df
+        denominator = dx @ Hdf
+        if denominator != 0:
+            H += np.outer(dx - Hdf, dx @ H) / denominator
+        x, fv = x_new, f_new
+        if _stalled(fv, dx, x, tol):
+            return _result(x, fv, i + 1, system, 'broyden', tol)
+
+    return _result(x, fv, max_iter, system, 'broyden', tol)
+
+
+SYSTEM_SOLVERS = {
+    'newton': newton_system,
+    'broyden': broyden_system,
+}
+
+
+def solve_system(expressions, starts, variables=None, method='newton', jacobian='ad', tol=1e-12, max_iter=None):
+    """
+    Solves F(v) = 0 from each starting point in starts and returns one
+    SystemResult per start, in the same order. expressions are strings in
+    the same syntax as the scalar functions; variables defaults to the free
+    names of the expressions in alphabetical order. method is 'newton' or
+    'broyden', jacobian 'ad' (exact) or 'fd' (finite differences).
+    """
+    try:
+        solver = SYSTEM_SOLVERS[method]
+    except KeyError:
+        raise ValueError(f"Unknown system method '{method}'. "
+                         f"Choose from: {', '.join(SYSTEM_SOLVERS)}") from None
+    system = expressions if isinstance(expressions, System) else System(expressions, variables)
+    options = {} if max_iter is None else {'max_iter': max_iter}
+    return [solver(system, x0, tol=tol, jacobian=jacobian, **options) for x0 in starts]
+
+
+def distinct_solutions(results, tol=1e-8):
+    """Converged solutions with near-duplicates (max-norm below tol) removed"""
+    solutions = []
+    for result in results:
+        if result.converged and all(np.max(np.abs(result.x - s)) >= tol for s in solutions):
+            solutions.append(result.x)
+    return solutions
@@ -0,0 +1,32 @@
+import os
+
+import batch
+from batch import solve_many
+
+
+def _solve_or_die(expression, search_range=(-100, 100), **options):
+    if expression == 'boom':
+        os._exit(1)
+    return _solve_one(expression, search_range, **options)
+
+
+_solve_one = batch.solve_one
+
+
+def test_worker_death_only_marks_the_killing_expression(monkeypatch):
+    # Pool workers are forked, so they see the patched solve_one
+    monkeypatch.setattr(batch, 'solve_one', _solve_or_die)
+    expressions = [f'x - {i}' for i in range(20)]
+    expressions[9] = 'boom'
+    results = solve_many(expressions, (-50, 50), workers=4, chunksize=4)
+    assert [r.expression for r in results] == expressions
+    assert results[9].error.startswith('BrokenProcessPool')
+    for i, result in enumerate(results):
+        if i != 9:
+            assert result.error is None and result.roots == [i]
+
+
+def test_errors_stay_with_their_expression():
+    results = solve_many(['x**2 - 4', 'x +* 2', 'foo(x)'], (-5, 5), workers=2, chunksize=1)
+    assert results[0].roots == [-2, 2] and results[0].error is None
+    assert results[1].error is not None and results[2].error is not None
@@ -0,0 +1,21 @@
+import pytest
+
+from autodiff import compile_with_derivative
+from chebyshev import chebyshev_roots
+from deepseek_conjunto import find_all_roots
+from expression_compiler import compile_expression, compile_vectorized, ignore_error
+from tracing import SILENT, Tracer
+
+
+def test_double_root_and_close_pair():
+    expr = '(x - 1)**2 * ((x - 3)**2 - 1e-6)'
+    found = chebyshev_roots(compile_vectorized(expr), -5, 5, fdf=compile_with_derivative(expr))
+    assert [x for x, _ in found.roots] == pytest.approx([1.0, 2.999, 3.001], abs=1e-6)
+    assert found.complete
+
+
+def test_overflowing_samples_do_not_break_the_scan():
+    f = compile_expression('exp(x) - 1e6', on_error=ignore_error)
+    roots, _, methods = find_all_roots(f, (-1000, 1000), scan='chebyshev', tracer=Tracer(SILENT))
+    assert roots == [pytest.approx(13.815510557964274)]
+    assert methods == ['chebyshev']
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from continuation import bind_parameter, sweep
+from tracing import SILENT, Tracer
+
+
+def test_bind_parameter():
+    assert bind_parameter('x**2 - p', 'p', -2.5) == 'x ** 2 - -2.5'
+
+
+def test_fold_pair_is_found_between_probe_points():
+    values = np.linspace(-1, 1, 10000)
+    result = sweep('x**3 - x - p', values, search_range=(-3, 3), tracer=Tracer(SILENT))
+    k = np.searchsorted(values, 0.2)
+    roots = sorted(branch[k] for branch in result.branches if not np.isnan(branch[k]))
+    assert roots == pytest.approx([-0.8787939, -0.2092870, 1.0880809], abs=1e-6)
+    assert result.rescans <= 3
+    # Continuation must stay far cheaper than a full scan per value
+    assert result.evaluations < 30 * len(values)
+
+
+def test_pair_born_on_a_probe_point():
+    result = sweep('x**2 - p', np.linspace(-1, 1, 2001), search_range=(-3, 3), tracer=Tracer(SILENT))
+    assert sorted(branch[-1] for branch in result.branches if not np.isnan(branch[-1])) == [-1.0, 1.0]
@@ -0,0 +1,37 @@
+import pytest
+
+from deepseek_conjunto import find_root_set, string_to_function
+from muller import compile_complex, find_roots_by_deflation
+from tracing import SILENT, Tracer
+
+
+@pytest.mark.parametrize('expr, count', [('cos(x) + 1', 32), ('sin(x)**2', 63)])
+def test_one_root_per_double_zero(expr, count):
+    roots = find_root_set(string_to_function(expr), (-100, 100), deflation=True, tracer=Tracer(SILENT))
+    assert len(roots) == count
+    assert {root.method for root in roots} == {'muller'}
+
+
+def test_underflow_is_not_a_root():
+    roots = find_root_set(string_to_function('(x-1)**2*exp(x)'), (-100, 100), deflation=True, tracer=Tracer(SILENT))
+    assert [root.x for root in roots] == [pytest.approx(1.0)]
+    assert roots.complex_roots == []
+
+
+def test_multiplicities_and_conjugates():
+    found = find_roots_by_deflation(compile_complex('(x - 1)**3 * (x**2 + 4) * exp(x)'), (), (-5, 5))
+    # Sorted by real part: the conjugate pair on the imaginary axis comes first
+    assert [z for z, _, _ in found] == [pytest.approx(-2j), pytest.approx(2j), pytest.approx(1.0, abs=1e-4)]
+    assert [multiplicity for _, _, multiplicity in found] == [1, 1, 3]
+    assert all(iterations > 0 for _, iterations, _ in found)
+
+
+def test_polynomial_complex_roots():
+    roots = find_root_set(string_to_function('x**2 + 1'), (-5, 5), deflation=True, tracer=Tracer(SILENT))
+    assert len(roots) == 0
+    assert sorted(root.x.imag for root in roots.complex_roots) == [-1.0, 1.0]
+
+
+def test_rejects_deflation_with_chebyshev():
+    with pytest.raises(ValueError):
+        find_root_set(string_to_function('sin(x)'), (-5, 5), scan='chebyshev', deflation=True)
@@ -0,0 +1,29 @@
+import math
+
+import pytest
+
+from expression_compiler import compile_expression, convert_power_notation, ignore_error, parse_expression
+
+
+def test_wrong_arity_constant_call_is_not_folded():
+    f = compile_expression('sin(1, 2) + x', on_error=ignore_error)
+    assert math.isnan(f(1.0))
+    assert math.isnan(compile_expression('sin(1, 2) + x', on_error=ignore_error, optimize=False)(1.0))
+
+
+@pytest.mark.parametrize('expr', ['((10**1000)**1000)**1000', '2**-2000', '__import__("os")', 'x.real'])
+def test_rejected_expressions(expr):
+    with pytest.raises(ValueError):
+        parse_expression(expr)
+
+
+def test_complex_power_is_an_evaluation_error():
+    errors = []
+    f = compile_expression('x**0.5 - 1', on_error=lambda x, e: errors.append(e))
+    assert math.isnan(f(-4.0))
+    assert f(4.0) == 1.0
+    assert len(errors) == 1
+
+
+def test_power_notation():
+    assert convert_power_notation('2x^3 + x²') == '2*x**3 + x**2'
@@ -0,0 +1,19 @@
+import pytest
+
+from deepseek_conjunto import find_all_roots
+from expression_compiler import compile_expression, ignore_error
+from interval_arithmetic import branch_and_prune, compile_interval
+
+
+def test_pruning_keeps_every_root():
+    expr = 'sin(x) - 0.5'
+    result = branch_and_prune(compile_interval(expr), -10, 10, fdf=compile_interval(expr, derivative=True))
+    assert result.complete
+    assert len(result.intervals) == 7
+    assert all(result.certified)
+
+
+def test_overflowing_endpoints_are_not_certified():
+    f = compile_expression('exp(x) - 1e6', on_error=ignore_error)
+    roots, _, _ = find_all_roots(f, (-1e6, 1e6), scan='interval', polynomial=False)
+    assert roots == [pytest.approx(13.815510557964274)]
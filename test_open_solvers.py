@@ -0,0 +1,26 @@
+import math
+
+import pytest
+
+from autodiff import compile_with_derivative
+from expression_compiler import compile_expression, ignore_error
+from open_solvers import OPEN_SOLVERS, solve_open
+
+
+@pytest.mark.parametrize('method', list(OPEN_SOLVERS))
+def test_open_solvers_converge_on_sqrt2(method):
+    f = compile_expression('x**2 - 2')
+    for fdf in (None, compile_with_derivative('x**2 - 2')):
+        root, iterations, evaluations = solve_open(f, 1.0, method, fdf=fdf)
+        assert root == pytest.approx(math.sqrt(2), abs=1e-15)
+        assert 0 < iterations <= 10 and evaluations <= 2 * iterations + 1
+
+
+@pytest.mark.parametrize('method', list(OPEN_SOLVERS))
+def test_open_solvers_stop_where_f_is_undefined(method):
+    assert solve_open(compile_expression('log(x)', on_error=ignore_error), -1.0, method)[0] is None
+
+
+def test_unknown_open_method():
+    with pytest.raises(ValueError, match="Unknown open method"):
+        solve_open(compile_expression('x'), 1.0, 'regula_falsi')
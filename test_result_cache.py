@@ -0,0 +1,35 @@
+import pytest
+
+from batch import solve_one
+from result_cache import ResultCache, cache_key
+from root_set import Root
+
+
+def test_put_get_round_trip(tmp_path):
+    cache = ResultCache(str(tmp_path / 'roots.sqlite'))
+    key = cache_key('x**2-2', search_range=[-5, 5])
+    roots = [Root(-1.4142135623730951, 6, 'brent', 2e-16, (-1.5, -1.0), 7),
+             Root(1.4142135623730951, 5, 'newton', -4e-16, None)]
+    cache.put(key, roots, evaluations=42)
+    assert cache.get(key) == (roots, 42)
+    cache.close()
+
+
+def test_get_reads_entries_without_evaluations(tmp_path):
+    cache = ResultCache(str(tmp_path / 'roots.sqlite'))
+    cache.put('old', [Root(1.0, 3, 'brent', 0.0, (0.5, 1.5))[:5]], evaluations=9)
+    assert cache.get('old') == ([Root(1.0, 3, 'brent', 0.0, (0.5, 1.5))], 9)
+    cache.close()
+
+
+def test_runtime_options_are_not_part_of_the_key():
+    assert cache_key('x**2 - 2', workers=4, executor='thread') == cache_key('x**2 - 2')
+
+
+def test_unserializable_options_bypass_the_cache(tmp_path):
+    path = str(tmp_path / 'roots.sqlite')
+    assert cache_key('x**2 - 2', fdf=lambda x: (x * x - 2, 2 * x)) is None
+    result = solve_one('x**2 - 2', (-5, 5), cache=path, fdf=lambda x: (x * x - 2, 2 * x), polynomial=False)
+    assert result.error is None
+    assert result.roots == [pytest.approx(-2 ** 0.5), pytest.approx(2 ** 0.5)]
+    assert solve_one('x**2 - 2', (-5, 5), cache=path, polynomial=False).cached is False
@@ -0,0 +1,27 @@
+import pytest
+
+from sandbox import Sandbox, resource, solve_sandboxed
+
+
+def test_timeout_kills_and_replaces_the_worker():
+    with Sandbox(timeout=0.5) as sandbox:
+        # About two billion evaluations: far longer than the timeout
+        result = sandbox.solve('sin(x) - 0.5', (-100, 100), step=1e-7)
+        assert result.error == "TimeoutError: no result within 0.5 s"
+        assert sandbox.restarts == 1
+        assert sandbox.solve('x**2 - 2', (-5, 5)).roots == [pytest.approx(-2 ** 0.5), pytest.approx(2 ** 0.5)]
+
+
+@pytest.mark.skipif(resource is None, reason="memory limits need the resource module")
+def test_memory_limit_turns_into_an_error_result():
+    with Sandbox(timeout=30, max_memory=2 ** 30) as sandbox:
+        # The array grid scan needs about 1.5 GiB for this step
+        result = sandbox.solve('sin(x) - 0.5', (-100, 100), step=1e-6, vectorized=True)
+        assert result.error.startswith('MemoryError')
+        assert sandbox.solve('sin(x) - 0.5', (-1, 1)).roots == [pytest.approx(0.5235987755982988)]
+
+
+def test_solve_sandboxed_keeps_input_order():
+    results = solve_sandboxed(['x - 1', 'x +* 2', 'x + 3'], (-5, 5), workers=2, timeout=10)
+    assert [r.roots for r in results] == [[1], [], [-3]]
+    assert results[1].error is not None
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from server import RootServer, query
+
+# About a second of work on one worker
+SLOW = {'expression': 'sin(x) - 0.5', 'range': [-100, 100], 'step': 1e-3}
+
+
+def test_replies_echo_ids():
+    async def run():
+        async with RootServer(port=0, workers=1) as server:
+            replies = await query(['x**2 - 4', {'expression': 'x - 1', 'range': [-5, 5], 'id': 7}, 'x +* 2'],
+                                  port=server.port)
+            stats = (await query(['{"op": "stats"}'], port=server.port))[0]
+        return replies, stats
+
+    replies, stats = asyncio.run(run())
+    by_expression = {reply['expression']: reply for reply in replies}
+    assert by_expression['x**2 - 4']['roots'] == [-2, 2]
+    assert by_expression['x - 1']['id'] == 7 and by_expression['x - 1']['roots'] == [1]
+    assert by_expression['x +* 2']['error'] is not None
+    assert stats['completed'] == 3 and stats['errors'] == 1
+
+
+def test_backpressure_caps_pending_solves():
+    async def run():
+        async with RootServer(port=0, workers=1, max_pending=1) as server:
+            requests = asyncio.create_task(query([SLOW, SLOW, SLOW], port=server.port))
+            await asyncio.sleep(0.2)
+            # The other two lines stay unread in the socket until the first solve is done
+            pending = (await query(['{"op": "stats"}'], port=server.port))[0]['pending']
+            return pending, await requests
+
+    pending, replies = asyncio.run(run())
+    assert pending == 1
+    assert [len(reply['roots']) for reply in replies] == [63, 63, 63]
+
+
+def test_slow_request_times_out():
+    async def run():
+        async with RootServer(port=0, workers=1, timeout=0.2) as server:
+            reply = (await query([SLOW], port=server.port))[0]
+            return reply, server.timeouts
+
+    reply, timeouts = asyncio.run(run())
+    assert reply['error'] == "Timed out after 0.2 s"
+    assert timeouts == 1
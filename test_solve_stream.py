@@ -0,0 +1,31 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+INPUT = '\n'.join([
+    '# comment lines and blank lines give no output',
+    '',
+    'x**2 - 4',
+    'log(x+0.2)**2+0.001',
+    '{"expression": "x - 1", "range": [-5, 5], "id": "a"}',
+    '{"expression": ',
+    'x +* 2',
+]) + '\n'
+
+
+@pytest.mark.parametrize('mode', ['all', 'single'])
+def test_every_output_line_is_json(mode):
+    completed = subprocess.run([sys.executable, 'solve_stream.py', '--mode', mode, '--range', '-10', '10'],
+                               input=INPUT, capture_output=True, text=True, timeout=60,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    records = [json.loads(line) for line in completed.stdout.splitlines()]
+    assert completed.returncode == 1
+    assert [record['line'] for record in records] == [3, 4, 5, 6, 7]
+    assert records[0]['roots'][0] == pytest.approx(-2)
+    assert records[1]['roots'] == [] and records[1]['error'] is None
+    assert records[2]['id'] == 'a' and records[2]['roots'] == [pytest.approx(1)]
+    assert records[3]['error'].startswith('Invalid input line')
+    assert records[4]['error'] is not None
@@ -0,0 +1,22 @@
+import pytest
+
+from systems import distinct_solutions, free_variables, solve_system
+
+
+@pytest.mark.parametrize('method', ['newton', 'broyden'])
+@pytest.mark.parametrize('jacobian', ['ad', 'fd'])
+def test_circle_and_diagonal(method, jacobian):
+    results = solve_system(['x**2 + y**2 - 4', 'x - y'], [(1, 1), (-1, -2)], method=method, jacobian=jacobian)
+    assert all(result.converged for result in results)
+    assert list(results[0].x) == pytest.approx([2 ** 0.5, 2 ** 0.5])
+    assert list(results[1].x) == pytest.approx([-2 ** 0.5, -2 ** 0.5])
+    assert len(distinct_solutions(results + results)) == 2
+
+
+def test_free_variables_are_sorted():
+    assert free_variables(['y*sin(x) - z', 'x + pi']) == ('x', 'y', 'z')
+
+
+def test_unknown_system_method():
+    with pytest.raises(ValueError, match="Unknown system method"):
+        solve_system(['x - 1'], [(0,)], method='gauss')
@@ -0,0 +1,78 @@
+import math
+
+# Verbosity levels
+SILENT = 0      # no output at all
+SUMMARY = 1     # one line per phase / root
+ITERATION = 2   # one line per iteration (the historical behaviour)
+
+# Phase codes stored in recorded traces
+PHASES = ('scan', 'bisection', 'newton', 'bracket')
+
+
+class Tracer:
+    """
+    Controls how much the solvers print and optionally records every iteration.
+    Hot loops check the level before building any message, so below
+    ITERATION no formatting work is done at all. With record=True each
+    iteration is appended to a compact NumPy structured array that can be
+    retrieved with records() or written with dump().
+    """
+
+    def __init__(self, level=ITERATION, record=False, capacity=1024):
+        self.level = level
+        self.recording = record
+        self._buffer = None
+        self._size = 0
+        self._capacity = capacity
+
+    @property
+    def per_iteration(self):
+        """True when per-iteration messages should be printed"""
+        return self.level >= ITERATION
+
+    @property
+    def summary(self):
+        """True when summary messages should be printed"""
+        return self.level >= SUMMARY
+
+    def record(self, phase, iteration, x, fx, a=math.nan, b=math.nan):
+        """Appends one iteration to the in-memory trace buffer"""
+        if self._buffer is None or self._size == len(self._buffer):
+            self._grow()
+        self._buffer[self._size] = (PHASES.index(phase), iteration, x, fx, a, b)
+        self._size += 1
+
+    def _grow(self):
+        import numpy as np  # only needed when traces are recorded
+
+        dtype = np.dtype([('phase', 'u1'), ('iteration', 'i4'), ('x', 'f8'),
+                          ('fx', 'f8'), ('a', 'f8'), ('b', 'f8')])
+        new = np.empty(self._capacity if self._buffer is None else 2 * len(self._buffer), dtype=dtype)
+        if self._buffer is not None:
+            new[:self._size] = self._buffer[:self._size]
+        self._buffer = new
+
+    def records(self):
+        """Returns the recorded iterations as a structured array (a copy)"""
+        if self._buffer is None:
+            self._grow()
+        return self._buffer[:self._size].copy()
+
+    def clear(self):
+        """Discards the recorded iterations"""
+        self._size = 0
+
+    def dump(self, path=None):
+        """Writes the recorded trace to a .npy file, or prints it when no path is given"""
+        data = self.records()
+        if path is not None:
+            import numpy as np
+            np.save(path, data)
+            return
+        for phase, iteration, x, fx, a, b in data:
+            print(f"{PHASES[phase]:>9} {iteration:4d}  x={x:.16e}  f(x)={fx:.6e}"
+                  + (f"  [{a:.6f}, {b:.6f}]" if not math.isnan(a) else ""))
+
+
+# Tracer used when a function is not given one; prints every iteration like before
+DEFAULT_TRACER = Tracer(ITERATION)